@@ -0,0 +1,100 @@
+import queue
+import threading
+
+# Game events that have a sound
+SOUNDS = {
+    'invalid_move': 'Error.mp3',
+}
+
+
+class NullAudio:
+    """
+    Audio backend that plays nothing, for headless runs.
+    """
+
+    def on_game_event(self, event):
+        pass
+
+    def close(self):
+        pass
+
+
+class PlaysoundAudio:
+    """
+    Plays sounds with playsound on a background thread, so the game never waits for a clip.
+    While a sound is playing, new requests are dropped instead of queued, so repeated
+    invalid moves can't pile up seconds of playback.
+    """
+
+    def __init__(self, sounds=SOUNDS):
+        """
+        :param sounds: Game event -> sound file.
+        """
+        self.sounds = sounds
+        self.requests = queue.Queue(maxsize=1)
+        self.playing = threading.Event()
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def on_game_event(self, event):
+        """
+        Play the sound of a game event, unless another sound is playing or waiting.
+        """
+        path = self.sounds.get(event)
+        if path is None or self.playing.is_set():
+            return
+        try:
+            self.requests.put_nowait(path)
+        except queue.Full:
+            pass
+
+    def _worker(self):
+        playsound = None
+        while True:
+            path = self.requests.get()
+            if path is None:
+                return
+            if playsound is None:
+                try:
+                    from playsound import playsound  # Loaded with the first sound, on the audio thread
+                except ImportError:
+                    print("playsound is not installed: the game is silent.")
+                    self.sounds = {}  # on_game_event stops sending requests
+                    return
+            self.playing.set()
+            try:
+                playsound(path)
+            finally:
+                self.playing.clear()
+
+    def close(self):
+        """
+        Stop the audio thread once the current sound is finished.
+        """
+        try:
+            self.requests.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class PygameAudio:
+    """
+    Plays preloaded pygame.mixer sounds; the mixer already plays them without blocking.
+    A sound that is still playing is not started again.
+    """
+
+    def __init__(self, sounds=SOUNDS):
+        """
+        :param sounds: Game event -> sound file. pygame.mixer must be initialized.
+        """
+        import pygame
+
+        self.sounds = {event: pygame.mixer.Sound(path) for event, path in sounds.items()}
+
+    def on_game_event(self, event):
+        sound = self.sounds.get(event)
+        if sound is not None and sound.get_num_channels() == 0:
+            sound.play()
+
+    def close(self):
+        pass
@@ -0,0 +1,129 @@
+from Game import FOUR_PROBABILITY
+import numpy as np
+
+# Boards are (N, rows, cols) uint8 arrays of tile exponents: 0 = empty cell, 1 = 2, 2 = 4, ...
+
+DIRECTIONS = ('left', 'right', 'up', 'down')
+
+
+def _to_lines(boards, direction):
+    """
+    View the boards so that the move goes toward index 0 of the last axis.
+    """
+    if direction == 'left':
+        return boards
+    if direction == 'right':
+        return boards[:, :, ::-1]
+    if direction == 'up':
+        return boards.transpose(0, 2, 1)
+    return boards[:, ::-1, :].transpose(0, 2, 1)
+
+
+def _from_lines(lines, direction):
+    """
+    Undo _to_lines.
+    """
+    if direction == 'down':
+        return lines[:, :, ::-1].transpose(0, 2, 1)
+    return _to_lines(lines, direction)
+
+
+def _compress(lines):
+    """
+    Slide the tiles of every line to the front, keeping their order.
+    """
+    order = np.argsort(lines == 0, axis=1, kind='stable')
+    return np.take_along_axis(lines, order, axis=1)
+
+
+def slide_lines(lines):
+    """
+    Move every line toward index 0 with the rules of Game2048.shift_tiles: tiles slide
+    over empty cells and every tile takes part in at most one merge per move.
+    :param lines: (M, width) uint8 exponents.
+    :return: (moved lines, score gained per line as int64)
+    """
+    lines = _compress(lines)
+    gains = np.zeros(lines.shape[0], dtype=np.int64)
+    for k in range(lines.shape[1] - 1):
+        # After a merge the right tile becomes empty, so it can't merge again with the next one
+        merge = (lines[:, k] != 0) & (lines[:, k] == lines[:, k + 1])
+        lines[merge, k] += 1
+        lines[merge, k + 1] = 0
+        gains[merge] += np.left_shift(np.int64(1), lines[merge, k].astype(np.int64))
+    return _compress(lines), gains
+
+
+def shift_boards(boards, directions):
+    """
+    Shift many boards at once.
+    :param boards: (N, rows, cols) uint8 exponents.
+    :param directions: N directions, as names from DIRECTIONS or as their indexes.
+    :return: (shifted boards, score gained per board, mask of the boards that changed)
+    """
+    boards = np.asarray(boards, dtype=np.uint8)
+    directions = np.asarray(directions)
+    if directions.dtype.kind in 'US':
+        names, inverse = np.unique(directions, return_inverse=True)
+        directions = np.array([DIRECTIONS.index(name) for name in names])[inverse.reshape(-1)]
+
+    shifted = boards.copy()
+    gains = np.zeros(boards.shape[0], dtype=np.int64)
+    for index, direction in enumerate(DIRECTIONS):
+        selected = np.nonzero(directions == index)[0]
+        if not selected.size:
+            continue
+        lines = _to_lines(boards[selected], direction)
+        count, length, width = lines.shape
+        moved_lines, line_gains = slide_lines(lines.reshape(count * length, width))
+        shifted[selected] = _from_lines(moved_lines.reshape(count, length, width), direction)
+        gains[selected] = line_gains.reshape(count, length).sum(axis=1)
+
+    moved = (shifted != boards).reshape(boards.shape[0], -1).any(axis=1)
+    return shifted, gains, moved
+
+
+def spawn_tiles(boards, rng, mask=None):
+    """
+    Add a new tile (2 or 4) to a random empty cell of every board, like Game2048.generate_new_tile.
+    :param boards: (N, rows, cols) uint8 exponents.
+    :param rng: A numpy.random.Generator, so spawn sequences can be reproduced.
+    :param mask: Optional (N,) bool array: only these boards get a tile (e.g. the moved mask).
+    :return: The new boards.
+    """
+    boards = np.array(boards, dtype=np.uint8)
+    count = boards.shape[0]
+    cells = boards.reshape(count, -1)
+
+    empty = cells == 0
+    keys = rng.random(empty.shape)
+    keys[~empty] = -1.0  # The biggest key is a uniform pick among the empty cells
+    chosen = keys.argmax(axis=1)
+    values = np.where(rng.random(count) < FOUR_PROBABILITY, 2, 1).astype(np.uint8)
+
+    selected = empty.any(axis=1)
+    if mask is not None:
+        selected &= np.asarray(mask, dtype=bool)
+    cells[selected, chosen[selected]] = values[selected]
+    return boards
+
+
+def new_boards(count, rows, cols, rng):
+    """
+    Return count new boards with two tiles each, like a new Game2048.
+    """
+    boards = np.zeros((count, rows, cols), dtype=np.uint8)
+    return spawn_tiles(spawn_tiles(boards, rng), rng)
+
+
+def game_to_exponents(game):
+    """
+    Return the board of a Game2048 as a (rows, cols) uint8 exponent array.
+    """
+    board = np.zeros((game.rows, game.cols), dtype=np.uint8)
+    for i in range(game.rows):
+        for j in range(game.cols):
+            value = game.get_value(i, j)
+            if value:
+                board[i, j] = value.bit_length() - 1
+    return board
@@ -0,0 +1,206 @@
+from DataStructure.DoublyLinkedList import DoublyLinkedList
+from Game import Game2048
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+# Run from the repository root: python -m Benchmark.Engine [--save] [--sizes 4,8] [--threshold 0.2]
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DIRECTIONS = ('left', 'right', 'up', 'down')
+RANDOM_PLAY_MOVES = 200  # Moves of the random-play benchmark, unless the game is over before
+
+
+def measure(function, min_time=0.2, repeat=3):
+    """
+    Time a function like timeit: find a number of calls that takes at least min_time,
+    repeat it and keep the best run.
+    :param function: Called without arguments. If it returns an int, that is how many operations it did
+                     (e.g. moves) and the time is per operation.
+    :return: Time per call (or per operation) in microseconds.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            result = function()
+            operations = result if type(result) is int and result > 0 else 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or number >= 1 << 20:
+            break
+        number *= 2
+
+    best = elapsed
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / number / operations * 1e6
+
+
+def half_full_positions(size, rng):
+    """
+    Return (value, i, j) for half of the cells of a size x size board.
+    """
+    cells = [(i, j) for i in range(size) for j in range(size)]
+    rng.shuffle(cells)
+    return [(rng.choice((2, 4, 8, 16)), i, j) for i, j in cells[:len(cells) // 2]]
+
+
+def list_benchmarks(size, rng):
+    """
+    DoublyLinkedList operations on a half full size x size board.
+    """
+    tiles = half_full_positions(size, rng)
+    full = DoublyLinkedList()
+    for value, i, j in tiles:
+        full.add_node(value, i, j)
+    positions = [(i, j) for i in range(size) for j in range(size)]
+
+    def add_nodes():
+        board = DoublyLinkedList()
+        for value, i, j in tiles:
+            board.add_node(value, i, j)
+
+    def get_nodes():
+        for i, j in positions:
+            full.get_node(i, j)
+
+    def add_and_delete_nodes():
+        board = DoublyLinkedList()
+        for value, i, j in tiles:
+            board.add_node(value, i, j)
+        for _, i, j in tiles:
+            board.delete_node(board.get_node(i, j))
+
+    return {
+        f"list.add_node x{len(tiles)} [{size}x{size}]": add_nodes,
+        f"list.get_node x{len(positions)} [{size}x{size}]": get_nodes,
+        f"list.add+delete_node x{len(tiles)} [{size}x{size}]": add_and_delete_nodes,
+        f"list.__deepcopy__ [{size}x{size}]": lambda: copy.deepcopy(full),
+    }
+
+
+def game_benchmarks(size, backend, rng):
+    """
+    Game2048 operations on a half full size x size board.
+    """
+    game = Game2048(size, size, backend=backend, rng=random.Random(size))  # Seeded: the position is reproducible
+    for value, i, j in half_full_positions(size, rng):
+        if game.get_value(i, j) is None:
+            if game.board is not None:
+                game.board.add_tile(value, i, j)
+            else:
+                game.sparse_matrix.add_node(value, i, j)
+    start = game.snapshot_board()
+    tag = f"[{size}x{size} {backend}]"
+
+    benchmarks = {}
+    for direction in DIRECTIONS:
+        def shift(direction=direction):
+            game.restore_board(start)
+            game.shift_tiles(direction)
+        benchmarks[f"game.shift_tiles {direction} (with restore) {tag}"] = shift
+
+    def restore():
+        game.restore_board(start)
+
+    def generate():
+        game.restore_board(start)
+        game.generate_new_tile()
+
+    benchmarks[f"game.restore_board {tag}"] = restore
+    benchmarks[f"game.generate_new_tile (with restore) {tag}"] = generate
+    benchmarks[f"game.check_game_over {tag}"] = game.check_game_over
+
+    undo_game = Game2048(size, size, backend=backend, rng=random.Random(size))
+    for _ in range(20):
+        undo_game.shift_tiles(rng.choice(DIRECTIONS))
+    if undo_game.journal.can_undo():
+        def undo_redo():
+            undo_game.undo()
+            undo_game.redo()
+        benchmarks[f"game.undo+redo {tag}"] = undo_redo
+
+    def random_play():
+        play_rng = random.Random(0)
+        played = Game2048(size, size, backend=backend, rng=random.Random(0))
+        moves = 0
+        while not played.check_game_over() and moves < RANDOM_PLAY_MOVES:
+            played.shift_tiles(play_rng.choice(DIRECTIONS))
+            moves += 1
+        return moves
+
+    # Per move, so a change of the spawn sequence (and of the game length) doesn't read as a regression
+    benchmarks[f"random play, per move {tag}"] = random_play
+    return benchmarks
+
+
+def collect(sizes):
+    rng = random.Random(2048)
+    benchmarks = {}
+    for size in sizes:
+        benchmarks.update(list_benchmarks(size, rng))
+        benchmarks.update(game_benchmarks(size, 'linked', rng))
+        if size == 4:
+            benchmarks.update(game_benchmarks(size, 'bitboard', rng))
+        benchmarks.update(game_benchmarks(size, 'dense', random.Random(size)))  # Keeps the other positions as in the baseline
+    return benchmarks
+
+
+def compare(results, baseline, threshold):
+    """
+    Print every result next to its baseline.
+    :return: The names of the benchmarks slower than baseline * (1 + threshold).
+    """
+    regressions = []
+    width = max(len(name) for name in results)
+    for name, value in results.items():
+        line = f"{name:{width}}  {value:12.2f} us"
+        old = baseline.get(name)
+        if old:
+            ratio = value / old
+            line += f"  baseline {old:12.2f} us  x{ratio:5.2f}"
+            if ratio > 1 + threshold:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the engine hot paths and compare them with the baseline.")
+    parser.add_argument('--sizes', default='4,8,16,32', help="Comma separated board sizes.")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown before a regression is flagged.")
+    parser.add_argument('--save', action='store_true', help="Store the results as the new baseline.")
+    parser.add_argument('--filter', default='', help="Only run benchmarks whose name contains this text.")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    benchmarks = collect(sizes)
+    results = {name: measure(function) for name, function in benchmarks.items() if args.filter in name}
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as file:
+            baseline = json.load(file)
+
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        baseline.update(results)
+        with open(BASELINE_FILE, 'w') as file:
+            json.dump(baseline, file, indent=1, sort_keys=True)
+        print(f"Saved {len(results)} results to {BASELINE_FILE}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+from Game import Game2048
+import argparse
+import random
+import time
+
+# Run from the repository root: python -m Benchmark.LargeBoard [--size 128] [--fills 0.05,0.5] [--backends linked,dense]
+
+DIRECTIONS = ('left', 'right', 'up', 'down')
+
+
+def filled_game(size, backend, fill, rng):
+    """
+    Return a size x size game with about fill * size * size random small tiles on it.
+    """
+    game = Game2048(size, size, backend=backend, rng=random.Random(rng.random()))
+    cells = [(i, j) for i in range(size) for j in range(size)]
+    rng.shuffle(cells)
+    for i, j in cells[:int(fill * len(cells))]:
+        if game.get_value(i, j) is None:
+            value = rng.choice((2, 4, 8, 16, 32, 64))
+            if game.board is not None:
+                game.board.add_tile(value, i, j)
+            else:
+                game.sparse_matrix.add_node(value, i, j)
+    return game
+
+
+def move_latencies(game, moves, rng):
+    """
+    Play random moves and time each complete move (shift, spawn and undo journal).
+    :return: Sorted move times in ms.
+    """
+    times = []
+    for _ in range(moves):
+        direction = rng.choice(DIRECTIONS)
+        start = time.perf_counter()
+        game.shift_tiles(direction)
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the move latency on large boards.")
+    parser.add_argument('--size', type=int, default=128)
+    parser.add_argument('--fills', default='0.05,0.25,0.5', help="Comma separated fractions of occupied cells.")
+    parser.add_argument('--backends', default='linked,dense', help="Comma separated backends.")
+    parser.add_argument('--moves', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size} board, {args.moves} random moves")
+    for fill in [float(fill) for fill in args.fills.split(',')]:
+        for backend in args.backends.split(','):
+            rng = random.Random(2048)
+            game = filled_game(args.size, backend, fill, rng)
+            times = move_latencies(game, args.moves, rng)
+            p50 = times[len(times) // 2]
+            p99 = times[min(len(times) - 1, len(times) * 99 // 100)]
+            print(f"\tfill {fill:4.0%}  {backend:8} p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  max {times[-1]:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
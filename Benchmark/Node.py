@@ -0,0 +1,90 @@
+from DataStructure.DoublyLinkedNode import DoublyLinkedNode
+import argparse
+import time
+import tracemalloc
+
+# Run from the repository root: python -m Benchmark.Node [--sizes 32,128]
+
+
+class PropertyNode:
+    """
+    The node layout used before DoublyLinkedNode got __slots__: a __dict__ per node
+    and a property for every field. Kept here only as the reference for the comparison.
+    """
+
+    def __init__(self, value=None, i=None, j=None):
+        self._value = value
+        self._i = i
+        self._j = j
+        self._prev = None
+        self._next = None
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, val):
+        self._value = val
+
+    @property
+    def i(self):
+        return self._i
+
+    @i.setter
+    def i(self, val):
+        self._i = val
+
+    @property
+    def j(self):
+        return self._j
+
+    @j.setter
+    def j(self, val):
+        self._j = val
+
+
+def bytes_per_node(node_class, count):
+    """
+    Measure the memory allocated by count nodes (shared small ints are not counted).
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [node_class(2, 0, 0) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    list_size = nodes.__sizeof__()
+    return (after - before - list_size) / count
+
+
+def ns_per_access(node_class, count, rounds=5):
+    """
+    Time reading value, i and j and writing j on every node, like shift_tiles does.
+    """
+    nodes = [node_class(2, k, k) for k in range(count)]
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for node in nodes:
+            if node.value and node.i >= 0:
+                node.j = node.j
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / (count * 4) * 1e9  # Four field accesses per node
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the slotted DoublyLinkedNode with the old property-based node.")
+    parser.add_argument('--sizes', default='32,128,512', help="Comma separated board sizes (a node per cell).")
+    args = parser.parse_args()
+
+    for size in [int(size) for size in args.sizes.split(',')]:
+        count = size * size
+        print(f"{size}x{size} board ({count} nodes)")
+        for name, node_class in (("property + __dict__", PropertyNode), ("__slots__", DoublyLinkedNode)):
+            print(f"\t{name:20} {bytes_per_node(node_class, count):7.1f} bytes/node"
+                  f"  {ns_per_access(node_class, count):6.1f} ns/access")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Run from the repository root: python -m Benchmark.Startup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pygame', 'playsound', 'numpy')
+
+ENGINE_IMPORT = """
+import sys
+import Game
+print('loaded:', ','.join(m for m in {heavy!r} if m in sys.modules) or 'none')
+""".format(heavy=HEAVY_MODULES)
+
+GUI_FIRST_FRAME = """
+from Game import Game2048
+from Graphic import Game2048GUI
+gui = Game2048GUI(Game2048(4, 4))
+gui.initialize_pygame()
+gui.draw_board()
+"""
+
+# (name, command, stdin)
+SCENARIOS = [
+    ("interpreter", [sys.executable, '-c', 'pass'], None),
+    ("engine import", [sys.executable, '-c', ENGINE_IMPORT], None),
+    ("cli: first board and quit", [sys.executable, 'main.py', '--mode', 'cli'], 'q\n'),
+    ("headless: 1 game", [sys.executable, 'main.py', '--mode', 'headless', '--games', '1', '--workers', '1'], None),
+    ("gui: first frame", [sys.executable, '-c', GUI_FIRST_FRAME], None),
+]
+
+
+def time_command(command, stdin, runs):
+    """
+    Run a command in a fresh interpreter several times.
+    :return: (run times in ms, output of the last run), or (None, error) if it failed.
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    times = []
+    output = ''
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, input=stdin, capture_output=True, text=True, cwd=ROOT, env=env)
+        times.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1:]
+        output = result.stdout
+    return times, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup and first-frame latency of every entry point.")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    for name, command, stdin in SCENARIOS:
+        times, output = time_command(command, stdin, args.runs)
+        if times is None:
+            print(f"{name:28} failed: {' '.join(output)}")
+            continue
+        line = f"{name:28} median {statistics.median(times):8.1f} ms   min {min(times):8.1f} ms"
+        if output.startswith('loaded:'):
+            line += f"   ({output.strip()})"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+from array import array
+import os
+import sys
+
+ROW_MASK = 0xFFFF
+MAX_EXPONENT = 15  # A nibble holds tiles up to 32768, and two 32768 tiles don't merge
+# Built tables are cached in this file next to the module's bytecode. It starts with the modification time
+# of this source file, so editing the move rules rebuilds them.
+TABLES_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__', 'bitboard_tables.bin')
+
+_LEFT_ROWS = None   # row -> row after a move to left
+_RIGHT_ROWS = None  # row -> row after a move to right
+_LEFT_SCORES = None   # row -> score gained by a move to left
+_RIGHT_SCORES = None  # row -> score gained by a move to right
+
+
+def _slide_row(exponents):
+    """
+    Slide a single row of exponents to the left with the same rules as Game2048.shift_tiles:
+    every tile can take part in one merge per move.
+    :param exponents: A list of 4 exponents (0 = empty cell).
+    :return: (new exponents, score gained)
+    """
+    tiles = [e for e in exponents if e]
+    result = []
+    score = 0
+    k = 0
+    while k < len(tiles):
+        if k + 1 < len(tiles) and tiles[k] == tiles[k + 1] and tiles[k] < MAX_EXPONENT:
+            result.append(tiles[k] + 1)
+            score += 1 << (tiles[k] + 1)
+            k += 2
+        else:
+            result.append(tiles[k])
+            k += 1
+    return result + [0] * (4 - len(result)), score
+
+
+def _pack_row(exponents):
+    return exponents[0] | (exponents[1] << 4) | (exponents[2] << 8) | (exponents[3] << 12)
+
+
+def build_tables():
+    """
+    Build the 65536-entry row lookup tables once per process, or load them from TABLES_CACHE
+    (about 1 ms instead of 170 ms).
+    A row is 16 bits, 4 bits per cell; the lowest nibble is the leftmost cell.
+    """
+    global _LEFT_ROWS, _RIGHT_ROWS, _LEFT_SCORES, _RIGHT_SCORES
+    if _LEFT_ROWS is not None:
+        return
+    tables = _load_tables()
+    if tables is None:
+        tables = _compute_tables()
+        _save_tables(tables)
+    _LEFT_ROWS, _RIGHT_ROWS, _LEFT_SCORES, _RIGHT_SCORES = tables
+
+
+def _source_stamp():
+    return array('Q', [os.stat(os.path.abspath(__file__)).st_mtime_ns])
+
+
+def _load_tables():
+    """
+    Return the tables stored in TABLES_CACHE, or None if it is missing or older than this module.
+    """
+    try:
+        with open(TABLES_CACHE, 'rb') as file:
+            stamp = array('Q')
+            stamp.fromfile(file, 1)
+            if stamp != _source_stamp():
+                return None
+            tables = []
+            for typecode in 'HHII':
+                table = array(typecode)
+                table.fromfile(file, ROW_MASK + 1)
+                if sys.byteorder == 'big':
+                    table.byteswap()
+                tables.append(table.tolist())  # Lists index faster than arrays in move()
+            return tables
+    except (OSError, EOFError):
+        return None
+
+
+def _save_tables(tables):
+    """
+    Write the tables to TABLES_CACHE; a read-only install just builds them every time.
+    """
+    temporary = f"{TABLES_CACHE}.{os.getpid()}"
+    try:
+        os.makedirs(os.path.dirname(TABLES_CACHE), exist_ok=True)
+        with open(temporary, 'wb') as file:
+            _source_stamp().tofile(file)
+            for typecode, table in zip('HHII', tables):
+                table = array(typecode, table)
+                if sys.byteorder == 'big':
+                    table.byteswap()
+                table.tofile(file)
+        os.replace(temporary, TABLES_CACHE)  # Concurrent processes never read a half-written file
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def _compute_tables():
+    """
+    Slide every possible row both ways.
+    :return: (left rows, right rows, left scores, right scores)
+    """
+    left_rows = [0] * (ROW_MASK + 1)
+    right_rows = [0] * (ROW_MASK + 1)
+    left_scores = [0] * (ROW_MASK + 1)
+    right_scores = [0] * (ROW_MASK + 1)
+
+    for row in range(ROW_MASK + 1):
+        exponents = [(row >> shift) & 0xF for shift in (0, 4, 8, 12)]
+
+        moved, score = _slide_row(exponents)
+        left_rows[row] = _pack_row(moved)
+        left_scores[row] = score
+
+        moved, score = _slide_row(exponents[::-1])
+        right_rows[row] = _pack_row(moved[::-1])
+        right_scores[row] = score
+
+    return left_rows, right_rows, left_scores, right_scores
+
+
+def transpose(board):
+    """
+    Transpose a packed 4x4 board, so columns can be moved with the row tables.
+    """
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _move_rows(board, rows_table, scores_table):
+    result = 0
+    score = 0
+    for shift in (0, 16, 32, 48):
+        row = (board >> shift) & ROW_MASK
+        result |= rows_table[row] << shift
+        score += scores_table[row]
+    return result, score
+
+
+def move(board, direction):
+    """
+    Apply a move to a packed board.
+    :param board: The packed 64-bit board.
+    :param direction: 'left', 'right', 'up' or 'down'.
+    :return: (new board, score gained)
+    """
+    if direction == 'left':
+        return _move_rows(board, _LEFT_ROWS, _LEFT_SCORES)
+    if direction == 'right':
+        return _move_rows(board, _RIGHT_ROWS, _RIGHT_SCORES)
+    if direction == 'up':
+        result, score = _move_rows(transpose(board), _LEFT_ROWS, _LEFT_SCORES)
+        return transpose(result), score
+    if direction == 'down':
+        result, score = _move_rows(transpose(board), _RIGHT_ROWS, _RIGHT_SCORES)
+        return transpose(result), score
+    raise ValueError(f"Unknown direction: {direction}")
+
+
+class BitBoard:
+    """
+    A 4x4 board packed into one integer: 4 bits per cell holding the log2 of the tile value.
+    Cell (i, j) lives in nibble i * 4 + j, so every row is 16 bits and moves are table lookups.
+    Tiles go up to 1 << MAX_EXPONENT (32768); bigger ones are refused with a ValueError.
+    """
+    rows = 4
+    cols = 4
+
+    def __init__(self, state=0):
+        """
+        Initialize the board.
+        :param state: The packed board (0 = empty board).
+        """
+        build_tables()
+        self.state = state
+        self._checked_state = None  # The state can_move and max_value were computed for
+        self._can_move = True
+        self._max_value = 0
+
+    def get_value(self, i, j):
+        """
+        Return the tile value at (i, j), or None for an empty cell.
+        """
+        exponent = (self.state >> (4 * (i * 4 + j))) & 0xF
+        return 1 << exponent if exponent else None
+
+    def add_tile(self, value, i, j):
+        """
+        Put a tile with the given value on the (empty) cell (i, j).
+        """
+        exponent = value.bit_length() - 1
+        if exponent > MAX_EXPONENT:
+            raise ValueError(f"The bitboard holds tiles up to {1 << MAX_EXPONENT}, not {value}.")
+        shift = 4 * (i * 4 + j)
+        self.state = (self.state & ~(0xF << shift)) | (exponent << shift)
+
+    def empty_cells(self):
+        """
+        Return all empty positions as (i, j) tuples.
+        """
+        state = self.state
+        return [(k >> 2, k & 3) for k in range(16) if not (state >> (4 * k)) & 0xF]
+
+    def random_empty_cell(self, rng):
+        """
+        Pick a random empty position; with 16 cells the scan is already constant time.
+        :param rng: A random.Random (or the random module).
+        :return: (i, j), or None if the board is full.
+        """
+        cells = self.empty_cells()
+        return rng.choice(cells) if cells else None
+
+    def snapshot(self):
+        """
+        Return an immutable picture of the board: the packed integer itself.
+        """
+        return self.state
+
+    def fingerprint(self):
+        """
+        Return a hashable key of the board for MoveCache: the packed integer, which can't collide.
+        """
+        return self.state
+
+    def restore(self, snapshot):
+        """
+        Restore the board from a snapshot.
+        """
+        self.state = snapshot
+
+    @staticmethod
+    def snapshot_diff(before, after):
+        """
+        Return the delta between two snapshots: the XOR of the packed boards.
+        """
+        return before ^ after
+
+    def apply_diff(self, delta):
+        """
+        Apply a delta made by snapshot_diff to the board in place.
+        """
+        self.state ^= delta
+
+    @staticmethod
+    def apply_snapshot_diff(snapshot, delta, backward=False):
+        """
+        Replay a delta made by snapshot_diff; XOR works the same in both directions.
+        """
+        return snapshot ^ delta
+
+    @staticmethod
+    def snapshot_to_exponents(snapshot, rows=4, cols=4):
+        """
+        Return the tile exponents of a snapshot as bytes, row by row (0 = empty cell).
+        """
+        return bytes((snapshot >> (4 * k)) & 0xF for k in range(16))
+
+    @staticmethod
+    def snapshot_from_exponents(exponents, rows=4, cols=4):
+        """
+        Build a snapshot from bytes made by snapshot_to_exponents.
+        """
+        if max(exponents, default=0) > MAX_EXPONENT:
+            raise ValueError(f"The bitboard holds tiles up to {1 << MAX_EXPONENT}, not {1 << max(exponents)}.")
+        return sum(exponent << (4 * k) for k, exponent in enumerate(exponents))
+
+    def shift(self, direction):
+        """
+        Shift all tiles in the given direction.
+        :return: (has_moved, score gained)
+        """
+        new_state, score = move(self.state, direction)
+        has_moved = new_state != self.state
+        self.state = new_state
+        return has_moved, score
+
+    def _check(self):
+        """
+        Recompute can_move and max_value, only when the board changed since the last call.
+        """
+        state = self.state
+        if state == self._checked_state:
+            return
+        self._can_move = any(move(state, direction)[0] != state
+                             for direction in ('left', 'right', 'up', 'down'))
+        exponent = max((state >> shift) & 0xF for shift in range(0, 64, 4))
+        self._max_value = 1 << exponent if exponent else 0
+        self._checked_state = state
+
+    def can_move(self):
+        """
+        Check if any of the four moves changes the board.
+        """
+        self._check()
+        return self._can_move
+
+    def max_value(self):
+        """
+        Return the biggest tile on the board (0 on an empty board).
+        """
+        self._check()
+        return self._max_value
+
+    @property
+    def size(self):
+        return sum(1 for shift in range(0, 64, 4) if (self.state >> shift) & 0xF)
+
+    def __iter__(self):
+        """
+        Iterate over the occupied cells as (value, i, j) tuples, row by row.
+        """
+        for k in range(16):
+            exponent = (self.state >> (4 * k)) & 0xF
+            if exponent:
+                yield 1 << exponent, k >> 2, k & 3
+
+    def __repr__(self):
+        return f"BitBoard(0x{self.state:016x})"
@@ -0,0 +1,278 @@
+from DataStructure.FreeCells import FreeCells
+from array import array
+
+MAX_EXPONENT = 255
+DIFF_CHUNK = 256  # Snapshots are compared chunk by chunk, and only differing chunks cell by cell
+EMPTY_FLAGS = bytes([1]) + bytes(255)  # bytes.translate table: exponent 0 (empty cell) -> 1, others -> 0
+
+
+def slide_line(line):
+    """
+    Slide one row or column of exponents toward index 0 with the rules of Game2048.shift_tiles:
+    every tile can take part in one merge per move. Only the occupied cells are looked at.
+    :param line: The exponents as bytes (0 = empty cell).
+    :return: (new exponents as bytes, score gained)
+    """
+    tiles = line.replace(b'\x00', b'')
+    result = bytearray()
+    score = 0
+    k = 0
+    while k < len(tiles):
+        if k + 1 < len(tiles) and tiles[k] == tiles[k + 1] and tiles[k] < MAX_EXPONENT:
+            result.append(tiles[k] + 1)
+            score += 1 << (tiles[k] + 1)
+            k += 2
+        else:
+            result.append(tiles[k])
+            k += 1
+    result.extend(bytes(len(line) - len(result)))
+    return bytes(result), score
+
+
+class DenseBoard:
+    """
+    A board of any size stored as a flat array('B') of tile exponents, row by row (0 = empty cell).
+    Moves read and write whole rows (cells[i * cols:(i + 1) * cols]) and columns (cells[j::cols]) as slices.
+    """
+
+    def __init__(self, rows, cols):
+        """
+        Initialize an empty board.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.cells = array('B', bytes(rows * cols))
+        self._version = 0  # Bumped on every change, so can_move is only redone when the board changed
+        self._checked_version = None
+        self._can_move = True
+        self._max_exponent = 0  # Kept up to date as tiles grow; None when the biggest tile went away
+        self._free_cells = None  # Flat indexes of the empty cells, built on first use by random_empty_cell
+
+    def get_value(self, i, j):
+        """
+        Return the tile value at (i, j), or None for an empty cell.
+        """
+        exponent = self.cells[i * self.cols + j]
+        return 1 << exponent if exponent else None
+
+    def add_tile(self, value, i, j):
+        """
+        Put a tile with the given value on the cell (i, j); also used to update a tile.
+        """
+        k = i * self.cols + j
+        exponent = value.bit_length() - 1
+        self._track_max(self.cells[k], exponent)
+        self.cells[k] = exponent
+        if self._free_cells is not None:
+            self._free_cells.discard(k)
+        self._version += 1
+
+    def delete_tile(self, i, j):
+        """
+        Empty the cell (i, j).
+        """
+        k = i * self.cols + j
+        self._track_max(self.cells[k], 0)
+        self.cells[k] = 0
+        if self._free_cells is not None:
+            self._free_cells.add(k)
+        self._version += 1
+
+    def empty_cells(self):
+        """
+        Return all empty positions as (i, j) tuples.
+        """
+        cols = self.cols
+        return [divmod(k, cols) for k, exponent in enumerate(self.cells) if not exponent]
+
+    def random_empty_cell(self, rng):
+        """
+        Pick a random empty position in O(log n) from the free list of empty cells.
+        :param rng: A random.Random (or the random module).
+        :return: (i, j), or None if the board is full.
+        """
+        if self._free_cells is None:
+            self._free_cells = FreeCells(self.cells.tobytes().translate(EMPTY_FLAGS))
+        k = self._free_cells.choice(rng)
+        return divmod(k, self.cols) if k is not None else None
+
+    def snapshot(self):
+        """
+        Return an immutable picture of the board: the exponents as bytes.
+        """
+        return self.cells.tobytes()
+
+    def fingerprint(self):
+        """
+        Return a hashable key of the board for MoveCache: the snapshot itself, whose hash is computed
+        in C and can't collide.
+        """
+        return self.cells.tobytes()
+
+    def restore(self, snapshot):
+        """
+        Restore the board from a snapshot.
+        """
+        self.cells = array('B', snapshot)
+        self._free_cells = None
+        self._max_exponent = None
+        self._version += 1
+
+    @staticmethod
+    def snapshot_diff(before, after):
+        """
+        Return the delta between two snapshots as (changed cell indexes, old exponents, new exponents):
+        an array('I') and two bytes objects, which stay small in the undo journal.
+        """
+        changed = array('I')
+        for start in range(0, len(after), DIFF_CHUNK):
+            stop = start + DIFF_CHUNK
+            if before[start:stop] != after[start:stop]:
+                changed.extend(k for k in range(start, min(stop, len(after))) if before[k] != after[k])
+        return changed, bytes(before[k] for k in changed), bytes(after[k] for k in changed)
+
+    def apply_diff(self, delta):
+        """
+        Apply a delta made by snapshot_diff to the board in place, keeping the free list up to date.
+        """
+        changed, old, new = delta
+        if new and self._max_exponent is not None:
+            if max(old) >= self._max_exponent > max(new):
+                self._max_exponent = None  # A backward delta took the biggest tile away
+            else:
+                self._max_exponent = max(self._max_exponent, max(new))
+        cells = self.cells
+        free_cells = self._free_cells
+        for k, exponent in zip(changed, new):
+            cells[k] = exponent
+            if free_cells is not None:
+                if exponent:
+                    free_cells.discard(k)
+                else:
+                    free_cells.add(k)
+        self._version += 1
+
+    @staticmethod
+    def apply_snapshot_diff(snapshot, delta, backward=False):
+        """
+        Replay a delta made by snapshot_diff on a snapshot.
+        :param backward: True to undo the delta instead of redoing it.
+        :return: The new snapshot.
+        """
+        changed, old, new = delta
+        cells = bytearray(snapshot)
+        for k, exponent in zip(changed, old if backward else new):
+            cells[k] = exponent
+        return bytes(cells)
+
+    @staticmethod
+    def snapshot_to_exponents(snapshot, rows, cols):
+        """
+        Return the tile exponents of a snapshot as bytes, row by row: the snapshot itself.
+        """
+        return bytes(snapshot)
+
+    @staticmethod
+    def snapshot_from_exponents(exponents, rows, cols):
+        """
+        Build a snapshot from bytes made by snapshot_to_exponents.
+        """
+        return bytes(exponents)
+
+    def lines(self, direction):
+        """
+        Return the slices of the rows or columns of a move, ordered so the move goes toward index 0.
+        """
+        rows, cols = self.rows, self.cols
+        if direction == 'left':
+            return [slice(i * cols, (i + 1) * cols) for i in range(rows)]
+        if direction == 'right':
+            return [slice((i + 1) * cols - 1, (i * cols - 1) if i else None, -1) for i in range(rows)]
+        if direction == 'up':
+            return [slice(j, rows * cols, cols) for j in range(cols)]
+        if direction == 'down':
+            return [slice((rows - 1) * cols + j, None, -cols) for j in range(cols)]
+        raise ValueError(f"Unknown direction: {direction}")
+
+    def shift(self, direction):
+        """
+        Shift all tiles in the given direction, a whole row or column at a time.
+        :return: (has_moved, score gained)
+        """
+        cells = self.cells
+        data = cells.tobytes()  # Lines are disjoint, so reading them from a copy is safe
+        free_cells = self._free_cells
+        has_moved = False
+        score = 0
+        for line_slice in self.lines(direction):
+            line = data[line_slice]
+            new_line, line_score = slide_line(line)
+            if new_line != line:
+                cells[line_slice] = array('B', new_line)
+                if free_cells is not None:
+                    for k, old, new in zip(range(*line_slice.indices(len(cells))), line, new_line):
+                        if old and not new:
+                            free_cells.add(k)
+                        elif new and not old:
+                            free_cells.discard(k)
+                has_moved = True
+                if line_score and self._max_exponent is not None:
+                    self._max_exponent = max(self._max_exponent, max(new_line))  # Merges only make tiles grow
+                score += line_score
+        if has_moved:
+            self._version += 1
+        return has_moved, score
+
+    def _track_max(self, old, new):
+        """
+        Keep the biggest exponent up to date when a cell goes from exponent old to new outside a move.
+        """
+        if self._max_exponent is None:
+            return
+        if new > self._max_exponent:
+            self._max_exponent = new
+        elif old == self._max_exponent and new < old:
+            self._max_exponent = None  # Maybe the last tile of that size: rescanned by max_value
+
+    def can_move(self):
+        """
+        Check if any move changes the board. Looking for an empty cell is a fast C scan, but a full board
+        costs a walk over every cell to look for equal neighbours, once per change of the board.
+        """
+        if self._checked_version != self._version:
+            cells, cols = self.cells, self.cols
+            can_move = 0 in cells
+            if not can_move:
+                for k in range(len(cells)):
+                    if (k % cols != cols - 1 and cells[k] == cells[k + 1]) or \
+                            (k + cols < len(cells) and cells[k] == cells[k + cols]):
+                        can_move = True
+                        break
+            self._can_move = can_move
+            self._checked_version = self._version
+        return self._can_move
+
+    def max_value(self):
+        """
+        Return the biggest tile on the board (0 on an empty board). Moves, new tiles and deltas keep
+        it up to date; the cells are only rescanned after a restore or when the biggest tile went away.
+        """
+        if self._max_exponent is None:
+            self._max_exponent = max(self.cells, default=0)
+        return 1 << self._max_exponent if self._max_exponent else 0
+
+    @property
+    def size(self):
+        return len(self.cells) - self.cells.count(0)
+
+    def __iter__(self):
+        """
+        Iterate over the occupied cells as (value, i, j) tuples, row by row.
+        """
+        cols = self.cols
+        for k, exponent in enumerate(self.cells):
+            if exponent:
+                yield 1 << exponent, k // cols, k % cols
+
+    def __repr__(self):
+        return f"DenseBoard({self.rows}x{self.cols}, {self.size} tiles)"
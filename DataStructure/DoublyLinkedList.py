@@ -1,66 +1,41 @@
-# from DoublyLinkedNode import DoublyLinkedNode
-
-import copy
+from DataStructure.DoublyLinkedNode import DoublyLinkedNode
+from DataStructure.FreeCells import FreeCells
+from DataStructure.MoveCache import zobrist_key
 
 
 class DoublyLinkedList:
-    def __init__(self):
+    def __init__(self, rows=None, cols=None):
         """
         Initialize an empty doubly linked list.
+        :param rows: Number of rows of the board, needed only for the free list of empty cells.
+        :param cols: Number of columns of the board.
         """
+        self.rows = rows
+        self.cols = cols
         self.head = None  # Pointer to the first node
         self.tail = None  # Pointer to the last node
         self._size = 0
+        self._index = {}  # (i, j) -> node, so lookups don't walk the list
+        self._rows = {}  # i -> {j: node}, the occupied cells of every row
+        self._cols = {}  # j -> {i: node}, the occupied cells of every column
+        self._value_counts = {}  # value -> number of nodes with that value
+        self._max_value = 0
+        self._mergeable_pairs = 0  # Adjacent nodes with equal values
+        self._free_cells = None  # Built on first use by random_empty_cell, then kept up to date
+        self._zobrist = 0  # XOR of the Zobrist keys of the nodes (see fingerprint)
+        self._changes = None  # (i, j) -> (value, i, j) or None before the tracking started (see start_tracking)
 
     def add_node(self, value, i, j):
         """
-        Add a new node to the list in the correct position based on (i, j).
+        Add a new node at the tail of the list in O(1).
+        The list is not kept in (i, j) order, since move_node changes positions in place: lookups go through
+        the position index, and row() / column() return the nodes of a line in order.
         :param value: The value of the node.
         :param i: The row index.
         :param j: The column index.
         """
-        new_node = DoublyLinkedNode(value=value, i=i, j=j)
-        
-        # Case 1: List is empty
-        if self.head is None:
-            self.head = new_node
-            self.tail = new_node
-            self._size += 1
-            return
-
-        # Case 2: Insert at the beginning
-        if (i < self.head.i) or (i == self.head.i and j < self.head.j):
-            new_node.next = self.head
-            self.head.prev = new_node
-            self.head = new_node
-            self._size += 1
-            return
-
-        # Case 3: Traverse the list to find the correct position
-        current = self.head
-        while current.next and (current.next.i < i or (current.next.i == i and current.next.j < j)):
-            current = current.next
+        self._append(DoublyLinkedNode(value=value, i=i, j=j))
 
-        # Case 3.1: Insert at the end
-        if current.next is None:
-            current.next = new_node
-            new_node.prev = current
-            self.tail = new_node
-            self._size += 1
-            return
-
-        # Case 3.2: Insert in the middle
-        new_node.next = current.next
-        new_node.prev = current
-        current.next.prev = new_node
-        current.next = new_node
-        self._size += 1
-        return
-    
-        print("you can't add at this position!")
-        
-        
-        
     def delete_node(self, node):
         """
         Delete a node from the list.
@@ -69,6 +44,8 @@ class DoublyLinkedList:
         if node is None:
             return
 
+        self._unindex_node(node)
+
         # Update pointers of surrounding nodes
         if node.prev:
             node.prev.next = node.next
@@ -94,7 +71,167 @@ class DoublyLinkedList:
         :param value: The new value to assign to the node.
         """
         if node is not None:
+            self._unindex_node(node)
             node.value = value
+            self._index_node(node)
+
+    def move_node(self, node, i, j):
+        """
+        Move a node to the position (i, j) and keep the position index up to date.
+        Positions must be changed through this method, not by writing node.i / node.j.
+        :param node: The node to be moved.
+        :param i: The new row index.
+        :param j: The new column index.
+        """
+        self._unindex_node(node)
+        node.i = i
+        node.j = j
+        self._index_node(node)
+
+    def _equal_neighbours(self, node):
+        """
+        Count the indexed neighbours of a node that have the same value.
+        """
+        count = 0
+        for delta_i, delta_j in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            neighbour = self._index.get((node.i + delta_i, node.j + delta_j))
+            if neighbour is not None and neighbour is not node and neighbour.value == node.value:
+                count += 1
+        return count
+
+    def _index_node(self, node):
+        """
+        Put a node in the position index and update the value counts and mergeable pairs.
+        """
+        if self._changes is not None and (node.i, node.j) not in self._changes:
+            self._changes[(node.i, node.j)] = None  # The cell was empty
+        self._index[(node.i, node.j)] = node
+        self._rows.setdefault(node.i, {})[node.j] = node
+        self._cols.setdefault(node.j, {})[node.i] = node
+        if self._free_cells is not None:
+            self._free_cells.discard(node.i * self.cols + node.j)
+        self._mergeable_pairs += self._equal_neighbours(node)
+        self._zobrist ^= zobrist_key(node.value, node.i, node.j)
+        self._value_counts[node.value] = self._value_counts.get(node.value, 0) + 1
+        if node.value > self._max_value:
+            self._max_value = node.value
+
+    def _unindex_node(self, node):
+        """
+        Take a node out of the position index and update the value counts and mergeable pairs.
+        """
+        if self._index.get((node.i, node.j)) is not node:
+            return
+        if self._changes is not None and (node.i, node.j) not in self._changes:
+            self._changes[(node.i, node.j)] = (node.value, node.i, node.j)
+        self._mergeable_pairs -= self._equal_neighbours(node)
+        del self._index[(node.i, node.j)]
+        del self._rows[node.i][node.j]
+        del self._cols[node.j][node.i]
+        if self._free_cells is not None:
+            self._free_cells.add(node.i * self.cols + node.j)
+        self._zobrist ^= zobrist_key(node.value, node.i, node.j)
+
+        count = self._value_counts[node.value] - 1
+        if count:
+            self._value_counts[node.value] = count
+        else:
+            del self._value_counts[node.value]
+            if node.value == self._max_value:
+                self._max_value = max(self._value_counts, default=0)
+
+    @property
+    def max_value(self):
+        """
+        The biggest value in the list (0 if the list is empty).
+        """
+        return self._max_value
+
+    @property
+    def mergeable_pairs(self):
+        """
+        The number of horizontally or vertically adjacent nodes with equal values.
+        """
+        return self._mergeable_pairs
+
+    def start_tracking(self):
+        """
+        Start recording which cells change, so tracked_changes can return the delta of a move
+        without snapshotting the whole list.
+        """
+        self._changes = {}
+
+    def tracked_changes(self):
+        """
+        Return the delta since start_tracking in the format of snapshot_diff, in time proportional
+        to the number of changed cells. Tracking goes on.
+        """
+        removed = []
+        added = []
+        for cell, before in self._changes.items():
+            node = self._index.get(cell)
+            after = (node.value, node.i, node.j) if node is not None else None
+            if before != after:
+                if before is not None:
+                    removed.append(before)
+                if after is not None:
+                    added.append(after)
+        return tuple(removed), tuple(added)
+
+    def stop_tracking(self):
+        """
+        Stop recording the changed cells.
+        """
+        self._changes = None
+
+    def fingerprint(self):
+        """
+        Return the Zobrist hash of the tiles, kept up to date as nodes are indexed and unindexed,
+        so getting it doesn't walk the list.
+        """
+        return self._zobrist
+
+    def occupied_rows(self):
+        """
+        Return the indexes of the rows that have at least one node.
+        """
+        return [i for i, row in self._rows.items() if row]
+
+    def occupied_columns(self):
+        """
+        Return the indexes of the columns that have at least one node.
+        """
+        return [j for j, column in self._cols.items() if column]
+
+    def row(self, i):
+        """
+        Return the nodes of row i ordered by column, without looking at the empty cells.
+        """
+        row = self._rows.get(i)
+        return [row[j] for j in sorted(row)] if row else []
+
+    def column(self, j):
+        """
+        Return the nodes of column j ordered by row, without looking at the empty cells.
+        """
+        column = self._cols.get(j)
+        return [column[i] for i in sorted(column)] if column else []
+
+    def random_empty_cell(self, rng):
+        """
+        Pick a random empty position in O(log n) from the free list of empty cells.
+        :param rng: A random.Random (or the random module).
+        :return: (i, j), or None if the board is full.
+        """
+        if self._free_cells is None:
+            if self.rows is None or self.cols is None:
+                raise ValueError("The list needs rows and cols to know its empty cells.")
+            free = bytearray(b'\x01') * (self.rows * self.cols)
+            for i, j in self._index:
+                free[i * self.cols + j] = 0
+            self._free_cells = FreeCells(free)
+        k = self._free_cells.choice(rng)
+        return divmod(k, self.cols) if k is not None else None
 
     def get_node(self, i, j):
         """
@@ -103,12 +240,7 @@ class DoublyLinkedList:
         :param j: Column index of the node.
         :return: The node if found, otherwise None.
         """
-        current = self.head
-        while current:
-            if current.i == i and current.j == j:
-                return current
-            current = current.next
-        return None
+        return self._index.get((i, j))
     
     
     @property
@@ -151,101 +283,115 @@ class DoublyLinkedList:
         :param memo: A dictionary used to store already copied objects (used by deepcopy).
         :return: A deep copy of the list.
         """
-        copied_list = DoublyLinkedList()
-        
-        current = self.head
-        while current:
-            # Add a node to the copied list using the original node's data
-            copied_list.add_node(
-                value = copy.deepcopy(current.value, memo), 
-                i = current.i, 
-                j = current.j
-            )
-            current = current.next
-        
-        return copied_list
+        return DoublyLinkedList.from_snapshot(self.snapshot(), self.rows, self.cols)
 
-    def __str__(self):
+    def snapshot(self):
         """
-        User-friendly representation of the list.
+        Return an immutable picture of the list as a tuple of (value, i, j) tuples.
+        The tuple can be shared freely (e.g. by undo/redo) because nothing mutates it.
         """
         nodes = []
         current = self.head
         while current:
-            nodes.append(str(current))
+            nodes.append((current.value, current.i, current.j))
             current = current.next
-        return "\n".join(nodes)
-    
-    
-    
-    
-    
-    
-class DoublyLinkedNode:
-    def __init__(self, value=None, i=None, j=None):
+        return tuple(nodes)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, rows=None, cols=None):
         """
-        Initialize the node with optional value, row index, and column index.
+        Build a new list from a snapshot in O(n log n), with the nodes in (i, j) order.
+        :param snapshot: A tuple made by snapshot().
+        :param rows: Number of rows of the board (see __init__).
+        :param cols: Number of columns of the board.
+        :return: A new DoublyLinkedList.
         """
-        self._value = value  # Internal storage for value
-        self._i = i          # Internal storage for row index
-        self._j = j          # Internal storage for column index
-        self._prev = None    # Pointer to the previous node
-        self._next = None    # Pointer to the next node
-
-    # Property for value
-    @property
-    def value(self):
-        return self._value
-
-    @value.setter
-    def value(self, val):
-        self._value = val
+        new_list = cls(rows, cols)
+        for value, i, j in sorted(snapshot, key=lambda tile: (tile[1], tile[2])):
+            new_list._append(DoublyLinkedNode(value=value, i=i, j=j))
+        return new_list
 
-    # Property for row index
-    @property
-    def i(self):
-        return self._i
-
-    @i.setter
-    def i(self, val):
-        self._i = val
-
-    # Property for column index
-    @property
-    def j(self):
-        return self._j
+    @staticmethod
+    def snapshot_diff(before, after):
+        """
+        Return the delta between two snapshots as (removed tiles, added tiles).
+        Only the cells touched by a move (moved, merged or spawned tiles) end up in it.
+        """
+        before_tiles = set(before)
+        after_tiles = set(after)
+        return tuple(before_tiles - after_tiles), tuple(after_tiles - before_tiles)
 
-    @j.setter
-    def j(self, val):
-        self._j = val
+    def apply_diff(self, delta):
+        """
+        Apply a delta made by snapshot_diff to the list in place, through delete_node and add_node
+        so the indexes and the free list stay up to date.
+        """
+        removed, added = delta
+        for _, i, j in removed:
+            self.delete_node(self._index[(i, j)])
+        for value, i, j in added:
+            self.add_node(value, i, j)
 
-    # Property for previous node
-    @property
-    def prev(self):
-        return self._prev
+    @staticmethod
+    def apply_snapshot_diff(snapshot, delta, backward=False):
+        """
+        Replay a delta made by snapshot_diff on a snapshot.
+        :param snapshot: The snapshot to start from.
+        :param delta: The (removed tiles, added tiles) delta.
+        :param backward: True to undo the delta instead of redoing it.
+        :return: The new snapshot.
+        """
+        removed, added = delta
+        if backward:
+            removed, added = added, removed
+        tiles = set(snapshot)
+        tiles.difference_update(removed)
+        tiles.update(added)
+        return tuple(tiles)
 
-    @prev.setter
-    def prev(self, node):
-        self._prev = node
+    @staticmethod
+    def snapshot_to_exponents(snapshot, rows, cols):
+        """
+        Return the tile exponents of a snapshot as bytes, row by row (0 = empty cell).
+        """
+        exponents = bytearray(rows * cols)
+        for value, i, j in snapshot:
+            exponents[i * cols + j] = value.bit_length() - 1
+        return bytes(exponents)
 
-    # Property for next node
-    @property
-    def next(self):
-        return self._next
+    @staticmethod
+    def snapshot_from_exponents(exponents, rows, cols):
+        """
+        Build a snapshot from bytes made by snapshot_to_exponents.
+        """
+        return tuple((1 << exponent, k // cols, k % cols) for k, exponent in enumerate(exponents) if exponent)
 
-    @next.setter
-    def next(self, node):
-        self._next = node
+    def __reduce__(self):
+        """
+        Pickle the list as its snapshot instead of recursing through the linked nodes.
+        """
+        return DoublyLinkedList.from_snapshot, (self.snapshot(), self.rows, self.cols)
 
-    def __repr__(self):
+    def _append(self, node):
         """
-        Debug-friendly representation of the node.
+        Link a node after the tail without looking for its sorted position.
         """
-        return f"Node(value={self._value}, i={self._i}, j={self._j})"
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+            node.prev = self.tail
+        self.tail = node
+        self._index_node(node)
+        self._size += 1
 
     def __str__(self):
         """
-        User-friendly string representation of the node.
+        User-friendly representation of the list.
         """
-        return f"Value: {self._value}, Position: ({self._i}, {self._j})"
-
+        nodes = []
+        current = self.head
+        while current:
+            nodes.append(str(current))
+            current = current.next
+        return "\n".join(nodes)
@@ -0,0 +1,91 @@
+from itertools import accumulate, compress, count, islice
+
+BLOCK_BITS = 6  # The cells are counted by blocks of 64
+BLOCK = 1 << BLOCK_BITS
+
+
+class FreeCells:
+    """
+    The empty cells of a board as flags on the flat indexes (i * cols + j), with a Fenwick tree of the number
+    of empty cells in every block of BLOCK cells: adding and removing a cell are O(log n), picking a random
+    cell is O(log n) plus a scan of one block in C.
+    choice() picks the cell rng.choice would pick from the list of the empty cells in row-major order, which
+    is what the bitboard does: the spawns of a seeded game are the same on every backend and don't depend on
+    the order in which cells were emptied, or on whether the free list was rebuilt (e.g. by a restore).
+    """
+
+    def __init__(self, free):
+        """
+        Initialize the free list in O(n / BLOCK) from flags.
+        :param free: A bytes-like object with one byte per cell, 1 for an empty cell and 0 for a tile.
+        """
+        self._free = bytearray(free)
+        size = len(self._free)
+        self._count = self._free.count(1)
+        if size <= BLOCK:  # Boards up to 8x8 have a single block
+            self._tree = [0, self._count]
+            self._blocks = self._top = 1
+            return
+        block_counts = [self._free.count(1, start, start + BLOCK) for start in range(0, size, BLOCK)]
+        prefix = list(accumulate(block_counts, initial=0))  # prefix[b] = empty cells in the b first blocks
+        # tree[b] = number of empty cells in the blocks (b - (b & -b), b], 1-based
+        self._tree = [prefix[b] - prefix[b - (b & -b)] for b in range(len(block_counts) + 1)]
+        self._blocks = len(block_counts)
+        self._top = 1 << (self._blocks.bit_length() - 1)  # Highest power of two <= blocks
+
+    def _update(self, k, delta):
+        tree = self._tree
+        b = (k >> BLOCK_BITS) + 1
+        while b <= self._blocks:
+            tree[b] += delta
+            b += b & -b
+
+    def add(self, k):
+        """
+        Mark a cell as empty (nothing happens if it already is).
+        """
+        if not self._free[k]:
+            self._free[k] = 1
+            self._count += 1
+            self._update(k, 1)
+
+    def discard(self, k):
+        """
+        Mark a cell as occupied (nothing happens if it already is).
+        """
+        if self._free[k]:
+            self._free[k] = 0
+            self._count -= 1
+            self._update(k, -1)
+
+    def choice(self, rng):
+        """
+        Return a random empty cell, or None if there is none.
+        :param rng: A random.Random (or the random module). It draws exactly what rng.choice would.
+        """
+        if not self._count:
+            return None
+        remaining = rng.randrange(self._count)  # The rank of the cell among the empty ones
+        tree = self._tree
+        block = 0
+        step = self._top
+        while step:
+            following = block + step
+            if following <= self._blocks and tree[following] <= remaining:
+                block = following
+                remaining -= tree[following]
+            step >>= 1
+        start = block << BLOCK_BITS
+        return next(islice(compress(count(start), self._free[start:start + BLOCK]), remaining, None))
+
+    def __contains__(self, k):
+        return 0 <= k < len(self._free) and self._free[k] == 1
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return compress(count(), self._free)
+
+    def __repr__(self):
+        return f"FreeCells({self._count}/{len(self._free)} empty)"
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+import random
+
+_ZOBRIST_RNG = random.Random(2048)
+_ZOBRIST_KEYS = {}  # (value, i, j) -> random 64-bit key, drawn on first use
+
+
+def zobrist_key(value, i, j):
+    """
+    Return the random 64-bit key of a tile. The Zobrist hash of a board is the XOR of the keys of its tiles,
+    so it is updated in O(1) when a tile is added or removed (XOR the tile's key again to take it out).
+    """
+    key = _ZOBRIST_KEYS.get((value, i, j))
+    if key is None:
+        key = _ZOBRIST_KEYS[(value, i, j)] = _ZOBRIST_RNG.getrandbits(64)
+    return key
+
+
+class MoveCache:
+    """
+    Bounded LRU memo of move results: (board fingerprint, direction) -> (board delta of the shift in the
+    format of the backend's snapshot_diff, score gained, has_moved). Positions recur a lot in search and
+    simulation, and a hit replaces the shift by applying the delta in place. Fingerprints come from the
+    board's fingerprint(), so a cache must only be shared by games of the same size and backend.
+    """
+
+    def __init__(self, capacity=1 << 16):
+        """
+        Initialize an empty cache.
+        :param capacity: How many move results are kept; the least recently used one is dropped first.
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()  # Least recently used on the left
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Return the result stored for a key and mark it as recently used, or None.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        Store the result of a move, dropping the least recently used one if the cache is full.
+        """
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Forget every result, but keep the counters.
+        """
+        self.entries.clear()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return (f"MoveCache({len(self.entries)}/{self.capacity} entries, {self.hits} hits, {self.misses} misses, "
+                f"{self.evictions} evictions, hit rate {self.hit_rate:.1%})")
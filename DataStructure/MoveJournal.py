@@ -0,0 +1,96 @@
+from collections import deque
+import sys
+
+
+def entry_size(entry):
+    """
+    Estimate how many bytes a journal entry keeps alive.
+    :param entry: A (board delta, score delta) tuple.
+    """
+    size = 0
+    pending = [entry]
+    while pending:
+        item = pending.pop()
+        size += sys.getsizeof(item)
+        if isinstance(item, tuple):
+            pending.extend(item)
+    return size
+
+
+class MoveJournal:
+    """
+    Undo/redo history where every move is a compact delta instead of a whole board.
+    An entry is (board delta, score delta); the board delta comes from the backend's
+    snapshot_diff and is replayed backward/forward with apply_snapshot_diff.
+    The oldest moves are forgotten once the entries use more than memory_budget bytes.
+    """
+
+    def __init__(self, memory_budget=1 << 20):
+        """
+        Initialize an empty journal.
+        :param memory_budget: How many bytes the undo/redo entries may use.
+        """
+        self.memory_budget = memory_budget
+        self.undo_entries = deque()  # Oldest move on the left
+        self.redo_entries = []  # Last undone move at the end
+        self.memory_used = 0
+
+    def record(self, board_delta, score_delta):
+        """
+        Record a new move. This clears the redo history.
+        :param board_delta: The board delta of the move.
+        :param score_delta: The score gained by the move.
+        """
+        for entry in self.redo_entries:
+            self.memory_used -= entry_size(entry)
+        self.redo_entries = []
+
+        entry = (board_delta, score_delta)
+        self.undo_entries.append(entry)
+        self.memory_used += entry_size(entry)
+
+        # Forget the oldest moves, but always keep the last one
+        while self.memory_used > self.memory_budget and len(self.undo_entries) > 1:
+            self.memory_used -= entry_size(self.undo_entries.popleft())
+
+    def restore(self, undo_entries, redo_entries):
+        """
+        Replace the history, e.g. with the one of a saved game.
+        :param undo_entries: Entries from the oldest move to the last one.
+        :param redo_entries: Undone entries, the last undone move at the end.
+        """
+        self.undo_entries = deque(undo_entries)
+        self.redo_entries = list(redo_entries)
+        self.memory_used = sum(entry_size(entry) for entry in self.undo_entries) + \
+            sum(entry_size(entry) for entry in self.redo_entries)
+
+    def undo(self):
+        """
+        Take the last move off the undo history and keep it for redo.
+        :return: The (board delta, score delta) entry, or None if there is nothing to undo.
+        """
+        if not self.undo_entries:
+            return None
+        entry = self.undo_entries.pop()
+        self.redo_entries.append(entry)
+        return entry
+
+    def redo(self):
+        """
+        Take the last undone move back to the undo history.
+        :return: The (board delta, score delta) entry, or None if there is nothing to redo.
+        """
+        if not self.redo_entries:
+            return None
+        entry = self.redo_entries.pop()
+        self.undo_entries.append(entry)
+        return entry
+
+    def can_undo(self):
+        return bool(self.undo_entries)
+
+    def can_redo(self):
+        return bool(self.redo_entries)
+
+    def __len__(self):
+        return len(self.undo_entries) + len(self.redo_entries)
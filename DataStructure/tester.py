@@ -10,7 +10,7 @@ dll.add_node(15, 1, 1)
 dll.add_node(20, 2, 0)
 
 # Print the list
-print(dll)  # Output will show nodes in order by (i, j)
+print(dll)  # Output will show nodes in insertion order
 
 print("---")
 
@@ -0,0 +1,134 @@
+from Game import Game2048
+from Batch import DIRECTIONS, game_to_exponents, new_boards, shift_boards, spawn_tiles
+import numpy as np
+import random
+
+# Actions are indexes into DIRECTIONS: 0 = left, 1 = right, 2 = up, 3 = down.
+# Observations are uint8 arrays of tile exponents (0 = empty cell, 1 = 2, 2 = 4, ...).
+
+
+def legal_action_masks(boards):
+    """
+    Return a (N, 4) bool array telling which actions change each board.
+    """
+    count = boards.shape[0]
+    _, _, moved = shift_boards(np.repeat(boards, len(DIRECTIONS), axis=0),
+                               np.tile(np.arange(len(DIRECTIONS)), count))
+    return moved.reshape(count, len(DIRECTIONS))
+
+
+class Game2048Env:
+    """
+    Gym-style environment around a single Game2048.
+    The reward of a step is the player_score gained by it; an illegal move gives 0 and changes nothing.
+    """
+
+    def __init__(self, rows=4, cols=4, backend=None, stop_at_win=True):
+        """
+        :param backend: Board backend (None = 'auto', see Game2048.choose_backend).
+        :param stop_at_win: End the episode when the biggest_number tile is reached.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.backend = backend or Game2048.choose_backend(rows, cols)
+        self.stop_at_win = stop_at_win
+        self.game = None
+
+    def reset(self, seed=None):
+        """
+        Start a new game.
+        :param seed: Seed for the tile spawns (None = unpredictable).
+        :return: The first observation.
+        """
+        self.game = Game2048(self.rows, self.cols, backend=self.backend, undo_memory_budget=0,
+                             rng=random.Random(seed))
+        return self.observation()
+
+    def observation(self):
+        return game_to_exponents(self.game)
+
+    def action_mask(self):
+        """
+        Return a (4,) bool array of the actions that change the board.
+        """
+        return legal_action_masks(self.observation()[np.newaxis])[0]
+
+    def step(self, action):
+        """
+        Play one move.
+        :param action: An index into DIRECTIONS.
+        :return: (observation, reward, done, info) where info holds 'score', 'moved' and 'action_mask'.
+        """
+        score = self.game.player_score
+        self.game.shift_tiles(DIRECTIONS[action])
+        reward = self.game.player_score - score
+
+        observation = self.observation()
+        action_mask = legal_action_masks(observation[np.newaxis])[0]
+        done = not action_mask.any() or (self.stop_at_win and self.game.check_win())
+        info = {'score': self.game.player_score, 'moved': self.game.has_moved, 'action_mask': action_mask}
+        return observation, reward, done, info
+
+
+class VectorGame2048Env:
+    """
+    K environments stepped in lockstep on one (K, rows, cols) exponent array, without a Python loop per board.
+    Finished environments are reset automatically; their last observation is in info['final_observation'].
+    """
+
+    def __init__(self, num_envs, rows=4, cols=4, win_exponent=11, seed=None):
+        """
+        :param num_envs: Number of environments.
+        :param win_exponent: End an episode when a tile reaches 2 ** win_exponent (None = never).
+        :param seed: Seed of the numpy Generator used for the tile spawns.
+        """
+        self.num_envs = num_envs
+        self.rows = rows
+        self.cols = cols
+        self.win_exponent = win_exponent
+        self.rng = np.random.default_rng(seed)
+        self.boards = None
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, seed=None):
+        """
+        Start K new games.
+        :return: The (K, rows, cols) observations.
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.boards = new_boards(self.num_envs, self.rows, self.cols, self.rng)
+        self.scores[:] = 0
+        return self.boards.copy()
+
+    def action_masks(self):
+        return legal_action_masks(self.boards)
+
+    def step(self, actions):
+        """
+        Play one move in every environment.
+        :param actions: (K,) indexes into DIRECTIONS.
+        :return: (observations, rewards, dones, info) where info holds 'scores', 'moved',
+                 'action_mask' and 'final_observation'.
+        """
+        shifted, rewards, moved = shift_boards(self.boards, actions)
+        self.boards = spawn_tiles(shifted, self.rng, mask=moved)
+        self.scores += rewards
+
+        action_mask = legal_action_masks(self.boards)
+        dones = ~action_mask.any(axis=1)
+        if self.win_exponent is not None:
+            dones |= (self.boards.reshape(self.num_envs, -1) >= self.win_exponent).any(axis=1)
+
+        info = {
+            'scores': self.scores.copy(),
+            'moved': moved,
+            'final_observation': self.boards.copy(),
+        }
+        if dones.any():
+            count = int(dones.sum())
+            self.boards[dones] = new_boards(count, self.rows, self.cols, self.rng)
+            self.scores[dones] = 0
+            action_mask[dones] = legal_action_masks(self.boards[dones])
+        info['action_mask'] = action_mask
+        return self.boards.copy(), rewards, dones, info
@@ -1,48 +1,201 @@
 from DataStructure.DoublyLinkedList import DoublyLinkedList
-from collections import deque
-from playsound import playsound
+from DataStructure.BitBoard import BitBoard
+from DataStructure.DenseBoard import DenseBoard
+from DataStructure.MoveJournal import MoveJournal
 import random
-import copy
+
+
+BACKENDS = ('linked', 'bitboard', 'dense', 'auto')
+DENSE_MIN_CELLS = 64  # 'auto' picks the dense backend from this many cells on (8x8 and up)
+FOUR_PROBABILITY = 0.3  # Chance that a new tile is a 4 instead of a 2
 
 
 class Game2048:
-    def __init__(self, rows, cols):
+    def __init__(self, rows, cols, backend='linked', undo_memory_budget=1 << 20, audio=None, rng=None,
+                 move_cache=None, initial_tiles=2):
+        """
+        Initialize the game.
+        :param rows: Number of rows of the board.
+        :param cols: Number of columns of the board.
+        :param backend: 'linked' (sparse doubly linked list, any size),
+                        'bitboard' (one packed integer with lookup tables, 4x4 only, tiles up to 32768:
+                        two 32768 tiles don't merge, where the other backends make a 65536),
+                        'dense' (flat array of exponents, any size) or
+                        'auto' (bitboard on 4x4, dense on big boards, linked otherwise).
+        :param undo_memory_budget: How many bytes the undo/redo history may use.
+        :param audio: An audio backend from Audio.py to play the sounds of game events (None = silent).
+        :param rng: A random.Random for the tile spawns, to make them reproducible (None = the random module).
+        :param move_cache: A DataStructure.MoveCache serving the results of moves already made from the same
+                           board, shared by games of this size and backend (None = always shift).
+        :param initial_tiles: How many tiles to spawn on the new board (0 for an empty board to fill in,
+                              which leaves rng untouched).
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == 'auto':
+            backend = self.choose_backend(rows, cols)
+        if backend == 'bitboard' and (rows, cols) != (BitBoard.rows, BitBoard.cols):
+            raise ValueError("The bitboard backend only supports 4x4 boards.")
+
         self.rows = rows
         self.cols = cols
-        self.sparse_matrix = DoublyLinkedList()
-        self.undo_stack = deque(maxlen=5)  # Stack to store previous states
-        self.redo_stack = []  # Stack for redo
+        self.backend = backend
+        self.sparse_matrix = None
+        self.board = None
+        self.clear_board()
+        self.journal = MoveJournal(undo_memory_budget)  # Move deltas for undo/redo
         self.player_score = 0  # Player score
         self.biggest_number = 2048
         self.has_moved = False
-        self.generate_new_tile()
-        self.generate_new_tile()
+        self.rng = rng if rng is not None else random
+        self.move_cache = move_cache
+        self.last_direction = None  # Direction of the last move that changed the board
+        self.last_spawn = None  # (value, i, j) of the last tile added by generate_new_tile
+        self.next_spawn = None  # (value, i, j) the next generate_new_tile places instead of a random tile
+        self.listeners = []  # Called with the name of every game event
+        if audio is not None:
+            self.add_listener(audio.on_game_event)
+        for _ in range(initial_tiles):
+            self.generate_new_tile()
 
-    def save_state(self, state=None):
+    @staticmethod
+    def choose_backend(rows, cols):
         """
-        Save the current state for undo/redo functionality.
+        Pick the backend 'auto' stands for: the bitboard when the board fits in it,
+        the dense array when the board is big enough for the linked list to be pure overhead.
         """
-        if not state:
-            state = {
-                'board': copy.deepcopy(self.sparse_matrix),
-                'score': self.player_score
-            }
-            
-        self.undo_stack.append(state)  # Add current state
-        self.redo_stack = []  # Clear redo stack after a new move
-    
-    def generate_new_tile(self):
+        if (rows, cols) == (BitBoard.rows, BitBoard.cols):
+            return 'bitboard'
+        if rows * cols >= DENSE_MIN_CELLS:
+            return 'dense'
+        return 'linked'
+
+    def clear_board(self):
         """
-        Add a new tile (2 or 4) to a random empty position on the board.
+        Replace the board with an empty one of the same backend.
         """
-        empty_positions = [(i, j) for i in range(self.rows)
-                           for j in range(self.cols)
-                           if self.sparse_matrix.get_node(i, j) is None]
-        
-        if empty_positions:
-            i, j = random.choice(empty_positions)
-            value = 4 if random.random() < 0.3 else 2
+        if self.backend == 'bitboard':
+            self.board = BitBoard()
+        elif self.backend == 'dense':
+            self.board = DenseBoard(self.rows, self.cols)
+        else:
+            self.sparse_matrix = DoublyLinkedList(self.rows, self.cols)
+
+    def place_tile(self, value, i, j):
+        """
+        Put a tile with the given value on the empty cell (i, j).
+        """
+        if self.board is not None:
+            self.board.add_tile(value, i, j)
+        else:
             self.sparse_matrix.add_node(value, i, j)
+
+    def save_state(self, state):
+        """
+        Record the move from the given state to the current one for undo/redo functionality.
+        :param state: The state from before the move ({'board': snapshot, 'score': score}). The board is
+                      None when the linked list tracked its changes since then (see begin_move).
+        """
+        board_delta = self.board_delta_since(state)
+        if state['board'] is None:
+            self.sparse_matrix.stop_tracking()
+        self.journal.record(board_delta, self.player_score - state['score'])
+
+    def board_delta_since(self, state):
+        """
+        Return the board delta from the given state to the current board, in the format of the backend's
+        snapshot_diff.
+        :param state: A state made by begin_move.
+        """
+        if state['board'] is None:
+            return self.sparse_matrix.tracked_changes()
+        return self.board_class().snapshot_diff(state['board'], self.snapshot_board())
+
+    def begin_move(self):
+        """
+        Return the state save_state needs to record the coming move. The packed boards are snapshotted;
+        the linked list records the cells the move changes instead, so big sparse boards don't pay for
+        a snapshot and a whole-board diff on every move.
+        """
+        if self.board is not None:
+            return {"board": self.snapshot_board(), "score": self.player_score}
+        self.sparse_matrix.start_tracking()
+        return {"board": None, "score": self.player_score}
+
+    def board_class(self):
+        """
+        Return the class of the board backend.
+        """
+        return type(self.board) if self.board is not None else DoublyLinkedList
+
+    def snapshot_board(self):
+        """
+        Return an immutable snapshot of the board, whatever the backend is:
+        a packed integer for the bitboard, bytes of exponents for the dense board
+        and a tuple of (value, i, j) for the linked list.
+        Snapshots are never mutated, so undo/redo can share them without copying.
+        """
+        if self.board is not None:
+            return self.board.snapshot()
+        return self.sparse_matrix.snapshot()
+
+    def restore_board(self, snapshot):
+        """
+        Replace the board with the one recorded in a snapshot.
+        """
+        if self.board is not None:
+            self.board.restore(snapshot)
+        else:
+            self.sparse_matrix = DoublyLinkedList.from_snapshot(snapshot, self.rows, self.cols)
+
+    def apply_board_diff(self, board_delta):
+        """
+        Apply a delta from the backend's snapshot_diff to the board in place, keeping its free list.
+        """
+        if self.board is not None:
+            self.board.apply_diff(board_delta)
+        else:
+            self.sparse_matrix.apply_diff(board_delta)
+
+    def fingerprint(self):
+        """
+        Return the hashable key of the board used by the move cache (see the backends' fingerprint).
+        """
+        if self.board is not None:
+            return self.board.fingerprint()
+        return self.sparse_matrix.fingerprint()
+
+    def get_value(self, i, j):
+        """
+        Return the tile value at (i, j), or None for an empty cell.
+        """
+        if self.board is not None:
+            return self.board.get_value(i, j)
+        node = self.sparse_matrix.get_node(i, j)
+        return node.value if node else None
+
+    def generate_new_tile(self):
+        """
+        Add a new tile (2 or 4) to a random empty position on the board, or the tile of next_spawn if it is set.
+        The position comes from the board's free list of empty cells, so no cell is scanned.
+        """
+        if self.next_spawn is not None:
+            value, i, j = self.next_spawn
+            self.next_spawn = None
+            self.place_tile(value, i, j)
+            self.last_spawn = (value, i, j)
+            return
+
+        if self.board is not None:
+            position = self.board.random_empty_cell(self.rng)
+        else:
+            position = self.sparse_matrix.random_empty_cell(self.rng)
+
+        if position is not None:
+            i, j = position
+            value = 4 if self.rng.random() < FOUR_PROBABILITY else 2
+            self.place_tile(value, i, j)
+            self.last_spawn = (value, i, j)
     
     def merge(self, node1, node2):
         """
@@ -191,58 +344,118 @@ class Game2048:
         """
         Shift all tiles in the given direction.
         Direction can be 'left', 'right', 'up', or 'down'.
+        With a move cache, a move already made from the same board is replayed from its stored delta,
+        which leaves the game exactly as computing the move would.
         """
-        state_copy = {"board": copy.deepcopy(self.sparse_matrix), "score": copy.deepcopy(self.player_score)}
+        state_copy = self.begin_move()
         self.has_moved = False
 
-        
-        if direction in ('left', 'right'):
-            outer_loop_range = range(self.rows)
-            inner_loop_range = range(self.cols) if direction == 'left' else range(self.cols - 1, -1, -1)
-            
-            get_node = lambda i, j: self.sparse_matrix.get_node(i, j)
-            set_position = lambda node, pos: setattr(node, 'j', pos)
-            frontier = lambda: 0 if direction == 'left' else self.cols - 1
-            
-            step = 1 if direction == 'left' else -1
+        if self.move_cache is None:
+            self.move_tiles(direction)
         else:
-            outer_loop_range = range(self.cols)
-            inner_loop_range = range(self.rows) if direction == 'up' else range(self.rows - 1, -1, -1)
-            
-            get_node = lambda i, j: self.sparse_matrix.get_node(j, i)
-            set_position = lambda node, pos: setattr(node, 'i', pos)
-            frontier = lambda: 0 if direction == 'up' else self.rows - 1
-            
-            step = 1 if direction == 'up' else -1
+            key = (self.fingerprint(), direction)
+            entry = self.move_cache.get(key)
+            if entry is None:
+                self.move_tiles(direction)
+                board_delta = None
+                if self.has_moved:
+                    board_delta = self.board_delta_since(state_copy)
+                self.move_cache.put(key, (board_delta, self.player_score - state_copy["score"], self.has_moved))
+            else:
+                board_delta, score, self.has_moved = entry
+                if self.has_moved:
+                    self.apply_board_diff(board_delta)
+                    self.player_score += score
 
-        for outer_loop_index in outer_loop_range:
+        self.end_move(state_copy, direction)
+
+    def move_tiles(self, direction):
+        """
+        Slide and merge the tiles in the given direction, updating has_moved and the score, without
+        spawning a tile or recording the move.
+        """
+        if self.board is not None:
+            self.has_moved, score = self.board.shift(direction)
+            self.player_score += score
+            return
+
+        # Every row or column is processed on its own, from the per-line index of its occupied
+        # cells, so the cost follows the number of tiles instead of the size of the board.
+        horizontal = direction in ('left', 'right')
+        forward = direction in ('left', 'up')
+        if horizontal:
+            lines = self.sparse_matrix.occupied_rows()
+            get_line = self.sparse_matrix.row
+            set_position = lambda node, pos: self.sparse_matrix.move_node(node, node.i, pos)
+            last = self.cols - 1
+        else:
+            lines = self.sparse_matrix.occupied_columns()
+            get_line = self.sparse_matrix.column
+            set_position = lambda node, pos: self.sparse_matrix.move_node(node, pos, node.j)
+            last = self.rows - 1
+        step = 1 if forward else -1
+
+        for line_index in lines:
+            nodes = get_line(line_index)
+            if not forward:
+                nodes.reverse()
             current = None
-            frontier_pos = frontier()
-            for inner_loop_index in inner_loop_range:
-                node = get_node(outer_loop_index, inner_loop_index)
-                if node:
-                    if current is None:
-                        current = node
-                        if (node.j if direction in ('left', 'right') else node.i) != frontier_pos:
-                            self.has_moved = True
+            frontier_pos = 0 if forward else last
+            for node in nodes:
+                position = node.j if horizontal else node.i
+                if current is None:
+                    current = node
+                    if position != frontier_pos:  # Tiles that stay put aren't reindexed
+                        self.has_moved = True
                         set_position(node, frontier_pos)
-                    elif current.value == node.value:
-                        self.merge(current, node)
+                elif current.value == node.value:
+                    self.merge(current, node)
+                    self.has_moved = True
+                    frontier_pos += step
+                    current = None
+                else:
+                    frontier_pos += step
+                    if position != frontier_pos:
                         self.has_moved = True
-                        frontier_pos += step
-                        current = None
-                    else:
-                        if (node.j if direction in ('left', 'right') else node.i) != frontier_pos + step:
-                            self.has_moved = True
-                        frontier_pos += step
                         set_position(node, frontier_pos)
-                        current = node
+                    current = node
 
+    def end_move(self, state_copy, direction):
+        """
+        Save the previous state and spawn a tile after a move, or complain if nothing moved.
+        :param state_copy: The state from before the move.
+        :param direction: The direction of the move.
+        """
         if self.has_moved:
-            self.save_state(state_copy)
+            self.last_direction = direction
             self.after_move()
+            self.save_state(state_copy)  # After the new tile, so the delta includes it
+            self.emit('move')
         else:
-            playsound("Error.mp3")
+            if state_copy['board'] is None:
+                self.sparse_matrix.stop_tracking()
+            self.emit('invalid_move')
+
+    def add_listener(self, listener):
+        """
+        Register a callable that is called with the name of every game event:
+        'move' (last_direction and last_spawn describe it), 'invalid_move', 'undo' and 'redo'.
+        The engine never waits for sounds or other side effects; listeners must return quickly.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Stop calling a listener registered with add_listener.
+        """
+        self.listeners.remove(listener)
+
+    def emit(self, event):
+        """
+        Tell all listeners about a game event.
+        """
+        for listener in self.listeners:
+            listener(event)
 
     def to_left(self):
         """
@@ -272,26 +485,19 @@ class Game2048:
     def check_game_over(self):
         """
         Check if there are no valid moves left (game over).
+        The board keeps its count of mergeable neighbours up to date, so this is O(1).
         """
+        if self.board is not None:
+            return not self.board.can_move()
+
         if self.sparse_matrix.size < self.rows * self.cols:
             return False  # There's still an empty cell
-        
-        for i in range(self.rows):
-            for j in range(self.cols):
-                node = self.sparse_matrix.get_node(i, j)
-                if node:
-                    # Check neighbors for possible merges
-                    for delta_i, delta_j in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                        neighbor = self.sparse_matrix.get_node(i + delta_i, j + delta_j)
-                        if neighbor and neighbor.value == node.value:
-                            return False
-        return True
-    
+        return self.sparse_matrix.mergeable_pairs == 0
+
     def check_win(self):
-        for node in self.sparse_matrix:
-            if node.value >= self.biggest_number:
-                return True
-        return False
+        if self.board is not None:
+            return self.board.max_value() >= self.biggest_number
+        return self.sparse_matrix.max_value >= self.biggest_number
 
     def after_move(self):
         """
@@ -304,36 +510,37 @@ class Game2048:
         """
         Undo the last move, restoring the previous state and score.
         """
-        if self.undo_stack:
-            current_state = {
-                'board': copy.deepcopy(self.sparse_matrix),
-                'score': self.player_score
-            }
-            self.redo_stack.append(current_state)
-            previous_state = self.undo_stack.pop()
-            self.sparse_matrix = previous_state['board']
-            self.player_score = previous_state['score']
+        entry = self.journal.undo()
+        if entry:
+            board_delta, score_delta = entry
+            snapshot = self.board_class().apply_snapshot_diff(self.snapshot_board(), board_delta, backward=True)
+            self.restore_board(snapshot)
+            self.player_score -= score_delta
+            self.emit('undo')
         else:
             print("Undo is not available.")
-    
+
     def redo(self):
         """
         Redo the last undone move, restoring the next state and score.
         """
-        if self.redo_stack:
-            current_state = {
-                'board': copy.deepcopy(self.sparse_matrix),
-                'score': self.player_score
-            }
-            self.undo_stack.append(current_state)
-            next_state = self.redo_stack.pop()
-            self.sparse_matrix = next_state['board']
-            self.player_score = next_state['score']
+        entry = self.journal.redo()
+        if entry:
+            board_delta, score_delta = entry
+            snapshot = self.board_class().apply_snapshot_diff(self.snapshot_board(), board_delta)
+            self.restore_board(snapshot)
+            self.player_score += score_delta
+            self.emit('redo')
         else:
             print("Redo is not available.")
 
     def __str__(self):
         board = [["[]" for _ in range(self.cols)] for _ in range(self.rows)] #create an empty board
+        if self.board is not None:
+            for value, i, j in self.board:
+                board[i][j] = str(value)
+            return "\n".join(["\t".join(row) for row in board])
+
         current = self.sparse_matrix.head
         while current:
             board[current.i][current.j] = str(current.value)
@@ -341,38 +548,48 @@ class Game2048:
 
         return "\n".join(["\t".join(row) for row in board])
     
-    def run(self):
+    def run(self, audio=None):
         """
         Run the game in an infinite loop, asking for user input to make moves.
+        :param audio: The audio backend playing the sounds of the session (None = Audio.PlaysoundAudio,
+                      Audio.NullAudio for silence). It is closed when the loop ends.
         """
-        while True:
-            print(str(self))  # Display the current game board
-            move = input("Enter your move (w = up, s = down, a = left, d = right, u = undo, r = redo q = quit): ").lower()
+        if audio is None:
+            from Audio import PlaysoundAudio
+            audio = PlaysoundAudio()
+        self.add_listener(audio.on_game_event)
+        try:
+            while True:
+                print(str(self))  # Display the current game board
+                move = input("Enter your move (w = up, s = down, a = left, d = right, u = undo, r = redo q = quit): ").lower()
             
-            if move == 'w':  # Move up
-                self.to_up()
-            elif move == 's':  # Move down
-                self.to_down()
-            elif move == 'a':  # Move left
-                self.to_left()
-            elif move == 'd':  # Move right
-                self.to_right()
-            elif move == 'u':  # Undo
-                self.undo()
-            elif move == 'r':  # Redo
-                self.redo()
-            elif move == 'q':  # Quit the game
-                print("Thanks for playing!")
-                break  # Exit the game loop
-            else:
-                print("Invalid move. Please use 'w', 'a', 's', 'd', or 'q'.")
+                if move == 'w':  # Move up
+                    self.to_up()
+                elif move == 's':  # Move down
+                    self.to_down()
+                elif move == 'a':  # Move left
+                    self.to_left()
+                elif move == 'd':  # Move right
+                    self.to_right()
+                elif move == 'u':  # Undo
+                    self.undo()
+                elif move == 'r':  # Redo
+                    self.redo()
+                elif move == 'q':  # Quit the game
+                    print("Thanks for playing!")
+                    break  # Exit the game loop
+                else:
+                    print("Invalid move. Please use 'w', 'a', 's', 'd', or 'q'.")
 
-            # Check if the game is over
-            if self.check_game_over():
-                print("GAME ENDED: Game Over! No more moves are possible.")
-                break  # End the game if no valid moves are left
+                # Check if the game is over
+                if self.check_game_over():
+                    print("GAME ENDED: Game Over! No more moves are possible.")
+                    break  # End the game if no valid moves are left
 
-            # Check for win condition
-            if self.check_win():
-                print("GAME ENDED: Congratulations! You won!")
-                break  # End the game if the player wins
\ No newline at end of file
+                # Check for win condition
+                if self.check_win():
+                    print("GAME ENDED: Congratulations! You won!")
+                    break  # End the game if the player wins
+        finally:
+            self.remove_listener(audio.on_game_event)
+            audio.close()
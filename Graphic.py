@@ -1,24 +1,82 @@
+from Audio import PygameAudio
+from TileCache import TileCache
+from collections import deque
 import pygame
 import sys
+import threading
+import time
+
+END_GAME_DELAY = 1000  # ms between the end of the game and the start of the fade effect
+FADE_LAYER_SPEED = 90  # Alpha per second of the end game overlay
+FADE_TEXT_SPEED = 450  # Alpha per second of the end game text
+TILE_POP_TIME = 100  # ms for a new or merged tile to grow to its full size
+MAX_TILE_SIZE = 100  # Tiles are never drawn bigger than this, in pixels
+MIN_TILE_SIZE = 12  # Boards that don't fit with tiles this big are shown through a scrollable viewport
+HUD_FONT_SIZE = 50
+HINT_TIME_BUDGET = 0.1  # Seconds the solver thinks about a hint
+HINT_EVENT = pygame.USEREVENT + 1  # Posted by the hint search with the board it searched and the move found
+
+
+class Animation:
+    """
+    A time-based animation: its progress depends on the clock, not on the number of frames drawn.
+    """
+
+    def __init__(self, start, duration, delay=0):
+        """
+        :param start: Start time in ms (pygame.time.get_ticks()).
+        :param duration: Length in ms.
+        :param delay: Time in ms to wait before the animation starts moving.
+        """
+        self.start = start + delay
+        self.duration = duration
+
+    def elapsed(self, now):
+        return max(0, now - self.start)
+
+    def progress(self, now):
+        """
+        Return how far the animation is, from 0.0 to 1.0.
+        """
+        return min(1.0, self.elapsed(now) / self.duration) if self.duration else 1.0
+
+    def done(self, now):
+        return now >= self.start + self.duration
+
 
 class Game2048GUI:
-    def __init__(self, game, window_width=600, window_height=600, margin_size=15):
+    def __init__(self, game, window_width=600, window_height=600, margin_size=15, fps=60, show_stats=False,
+                 replay=None):
         """
         Initialize the GUI for the 2048 game.
         :param game: An instance of the Game2048 class.
         :param window_width: Width of the game window.
         :param window_height: Height of the game window.
+        :param fps: Frame rate while something is animating; the GUI sleeps when nothing moves.
+        :param show_stats: Print frame time and keypress-to-frame latency stats on exit.
+        :param replay: A Replay.GameReplay to scrub through instead of playing (game is then replay.game):
+                       Left/Right step one move, Down/Up jump a checkpoint interval, Home/End go to the ends.
         """
+        self.replay = replay
+        if replay is not None:
+            game = replay.game
+        self.fps = fps
+        self.show_stats = show_stats
+        self.clock = None
         self.game = game
         self.window_width = window_width
         self.window_height = window_height
-        self.margin_size = margin_size
-
-        # Dynamic tile size calculation
-        self.tile_size = 100
+        self.margin_size = margin_size  # Space around the score area, and between tiles of MAX_TILE_SIZE
 
-        self.width = self.tile_size * self.game.cols + self.margin_size * (self.game.cols + 1)
-        self.height = self.tile_size * self.game.rows + self.margin_size * (self.game.rows + 1)
+        # Set by update_layout from the window size
+        self.tile_size = MAX_TILE_SIZE
+        self.tile_margin = margin_size  # Space between tiles, scaled with the tiles
+        self.view_i = 0  # Top left cell of the viewport
+        self.view_j = 0
+        self.view_rows = self.game.rows  # Number of rows and columns in the viewport
+        self.view_cols = self.game.cols
+        self.width = 0
+        self.height = 0
 
         # Colors for tiles and text
         self.colors = {
@@ -33,6 +91,8 @@ class Game2048GUI:
             512: (237, 200, 80),
             1024: (237, 197, 63),
             2048: (237, 194, 46),
+            "super tile": (60, 58, 50),
+            "super tile text": (249, 246, 242),
             "empty cells color": (189, 172, 151),
             "board color": (155, 137, 122),
             "score background": (25, 25, 25),
@@ -44,17 +104,38 @@ class Game2048GUI:
         }
 
         self.font = None
+        self.hud_font = None
+        self.tile_cache = TileCache(self.colors)
         self.screen = None
-        self.error_sound = None
+        self.audio = None
         self.game_over = False
         self.win = False
         self.end_game_layer_alpha = 0
         self.end_game_text_alpha = 0
+        self.hint = None  # Move suggested by the solver, shown until the next key press
+        self.hint_solver = None
+        self.hint_search = None  # Thread looking for a hint, so key presses never wait for the solver
+
+        # What is on the screen, so only the changes are drawn
+        self.drawn_cells = {}  # (i, j) -> value drawn there
+        self.drawn_hud = None  # (score, high score, hint) drawn in the score and hint areas
+        self.drawn_hud_texts = []  # Screen areas of the HUD texts drawn, which can stick out of the HUD areas
+        self.drawn_fade = None  # (layer alpha, text alpha) of the end game overlay drawn
+        self.full_redraw = True
+
+        # Animations
+        self.fade_animation = None  # Started when the game is won or lost
+        self.tile_animations = {}  # (i, j) -> Animation of a tile popping in
+
+        # Frame stats in ms
+        self.frame_times = deque(maxlen=1000)  # Time to draw a frame
+        self.input_latencies = deque(maxlen=1000)  # From handling a key press to the frame showing it
+        self.pending_key_time = None
 
         # Score attributes
-        self.score_width = self.width // 3
         self.score_height = self.margin_size * 3
         self.high_score = 0
+        self.update_layout()
     
     def initialize_pygame(self):
         """
@@ -62,39 +143,92 @@ class Game2048GUI:
         """
         pygame.init()
         pygame.mixer.init()
-        self.error_sound = pygame.mixer.Sound('Error.mp3')
+        self.audio = PygameAudio()
+        self.game.add_listener(self.audio.on_game_event)
         self.screen = pygame.display.set_mode((self.window_width, self.window_height), pygame.RESIZABLE)
         pygame.display.set_caption("2048")
         pygame.display.set_icon(pygame.image.load("2048_icon.png"))
-        self.font = pygame.font.Font(None, int(self.tile_size // 2))
+        self.hud_font = pygame.font.Font(None, HUD_FONT_SIZE)
+        self.update_layout()
+
+    def update_layout(self):
+        """
+        Fit the board in the window: tiles (and the space between them) shrink with the window and the
+        board size, down to MIN_TILE_SIZE. Bigger boards show only the viewport of cells that fits.
+        """
+        rows, cols = self.game.rows, self.game.cols
+        available_width = self.window_width
+        available_height = self.window_height - 2 * (self.score_height + self.margin_size)
+        ratio = self.margin_size / MAX_TILE_SIZE  # Margin per pixel of tile
+        tile_size = int(min(available_width / (cols + (cols + 1) * ratio),
+                            available_height / (rows + (rows + 1) * ratio)))
+        self.tile_size = max(MIN_TILE_SIZE, min(MAX_TILE_SIZE, tile_size))
+        self.tile_margin = max(1, round(self.tile_size * ratio))
+
+        pitch = self.tile_size + self.tile_margin
+        self.view_rows = max(1, min(rows, (available_height - self.tile_margin) // pitch))
+        self.view_cols = max(1, min(cols, (available_width - self.tile_margin) // pitch))
+        self.scroll(0, 0)  # Keep the viewport inside the board
+
+        self.width = pitch * self.view_cols + self.tile_margin
+        self.height = pitch * self.view_rows + self.tile_margin
+        if pygame.font.get_init():
+            self.font = pygame.font.Font(None, max(1, self.tile_size // 2))
         self.update_offsets()
 
-        # Calculate offsets to center the board
-        self.offset_x = (self.window_width - self.width) // 2
-        self.offset_y = (self.window_height - self.height) // 2
+    def scroll(self, delta_i, delta_j):
+        """
+        Move the viewport by the given number of cells, staying inside the board.
+        """
+        view_i = max(0, min(self.game.rows - self.view_rows, self.view_i + delta_i))
+        view_j = max(0, min(self.game.cols - self.view_cols, self.view_j + delta_j))
+        if (view_i, view_j) != (self.view_i, self.view_j):
+            self.view_i, self.view_j = view_i, view_j
+            self.full_redraw = True
 
-        self.font = pygame.font.Font(None, int(self.tile_size // 2))
-        
+    def visible_cells(self):
+        """
+        Return the (i, j) board positions inside the viewport.
+        """
+        return [(i, j) for i in range(self.view_i, self.view_i + self.view_rows)
+                for j in range(self.view_j, self.view_j + self.view_cols)]
     
-    def draw_tile(self, value, x, y):
+    def draw_tile(self, value, x, y, scale=1.0):
         """
         Draw a single tile on the board.
         :param value: Value of the tile.
         :param x: X-coordinate of the tile.
         :param y: Y-coordinate of the tile.
+        :param scale: Size of the tile relative to a full tile (for the pop animation).
         """
-        rect_x = self.offset_x + self.margin_size + (x * (self.tile_size + self.margin_size))
-        rect_y = self.offset_y + self.margin_size + (y * (self.tile_size + self.margin_size))
-        color = self.colors.get(value, self.colors["empty cells color"])  # Default color for empty tiles is board color
-
-        pygame.draw.rect(self.screen, color, (rect_x, rect_y, self.tile_size, self.tile_size), border_radius=10)
-
-        if value:
-            text = self.font.render(str(value), True, self.colors["number colors"])
-            text_rect = text.get_rect(center=(rect_x + self.tile_size // 2, rect_y + self.tile_size // 2))
-            self.screen.blit(text, text_rect)
+        rect_x, rect_y = self.tile_position(x, y)
+        surface = self.tile_cache.get(value, self.tile_size, self.font)
+        if scale < 1.0:
+            size = max(1, int(self.tile_size * scale))
+            offset = (self.tile_size - size) // 2
+            self.screen.blit(self.tile_cache.get(None, self.tile_size, self.font), (rect_x, rect_y))
+            self.screen.blit(pygame.transform.smoothscale(surface, (size, size)), (rect_x + offset, rect_y + offset))
+        else:
+            self.screen.blit(surface, (rect_x, rect_y))
             
             
+    def tile_position(self, x, y):
+        """
+        Return the screen position of the top left corner of the tile in column x and row y of the board.
+        """
+        rect_x = self.offset_x + self.tile_margin + ((x - self.view_j) * (self.tile_size + self.tile_margin))
+        rect_y = self.offset_y + self.tile_margin + ((y - self.view_i) * (self.tile_size + self.tile_margin))
+        return rect_x, rect_y
+
+    def hud_rects(self):
+        """
+        Return the screen areas of the score (above the board) and of the hint (under the board).
+        """
+        score_area = pygame.Rect(self.offset_x, self.offset_y - self.score_height - self.margin_size,
+                                 self.width, self.score_height + self.margin_size)
+        hint_area = pygame.Rect(self.offset_x, self.offset_y + self.height, self.width, self.score_height)
+        return [score_area, hint_area]
+
     def draw_score(self):
         """
         Draw the score section above the game board.
@@ -113,16 +247,34 @@ class Game2048GUI:
 
         # Draw current score
         score_text = f"Score: {self.game.player_score}"
-        score_surface = self.font.render(score_text, True, self.colors["score text"])
+        score_surface = self.hud_font.render(score_text, True, self.colors["score text"])
         score_rect = score_surface.get_rect(center=(self.offset_x + self.width // 4, self.offset_y - self.score_height // 2))
-        self.screen.blit(score_surface, score_rect)
+        self.drawn_hud_texts = [self.screen.blit(score_surface, score_rect)]
 
         # Draw high score
         high_score_text = f"High Score: {self.high_score}"
-        high_score_surface = self.font.render(high_score_text, True, self.colors["score text"])
+        high_score_surface = self.hud_font.render(high_score_text, True, self.colors["score text"])
         high_score_rect = high_score_surface.get_rect(center=(self.offset_x + 3 * self.width // 4, self.offset_y - self.score_height // 2))
-        self.screen.blit(high_score_surface, high_score_rect)
+        self.drawn_hud_texts.append(self.screen.blit(high_score_surface, high_score_rect))
+
+        # Draw the hint (or the replay position) under the board
+        status = self.status_text()
+        if status:
+            hint_surface = self.hud_font.render(status, True, self.colors["score text"])
+            hint_rect = hint_surface.get_rect(center=(self.offset_x + self.width // 2,
+                                                      self.offset_y + self.height + self.score_height // 2))
+            self.drawn_hud_texts.append(self.screen.blit(hint_surface, hint_rect))
     
+    def status_text(self):
+        """
+        Return the text of the area under the board, or None.
+        """
+        if self.replay is not None:
+            return f"Move {self.replay.position}/{len(self.replay)}"
+        if self.hint:
+            return f"Hint: {self.hint}"
+        return None
+
     def draw_board(self):
         """
         Draw the entire game board with the score.
@@ -132,28 +284,75 @@ class Game2048GUI:
         # Draw score
         self.draw_score()
 
-        # Draw tiles
-        for i in range(self.game.rows):
-            for j in range(self.game.cols):
-                cell = self.game.sparse_matrix.get_node(i, j)
-                value = cell.value if cell else None
-                self.draw_tile(value, j, i)  # j = x = column and i = y = row
-                
+        # Draw the tiles of the viewport
+        self.drawn_cells.clear()
+        for i, j in self.visible_cells():
+            value = self.game.get_value(i, j)
+            self.draw_tile(value, j, i)  # j = x = column and i = y = row
+            self.drawn_cells[(i, j)] = value
+        self.drawn_hud = (self.game.player_score, self.high_score, self.status_text())
+        self.drawn_fade = (self.end_game_layer_alpha, self.end_game_text_alpha)
+
         if self.game_over:
              self.draw_fade_effect(False) # False = lose
         elif self.win:
              self.draw_fade_effect(True) # True = win
 
         pygame.display.flip()  # Update the surface
-        
-        
-    
+        self.full_redraw = False
+        self.tile_animations.clear()  # Everything was just drawn at full size
+
+    def draw_changes(self):
+        """
+        Redraw only the tiles and score texts that changed since the last frame,
+        and push just those areas to the display. Nothing is drawn when the board is static.
+        :return: True if anything was drawn.
+        """
+        fade = (self.end_game_layer_alpha, self.end_game_text_alpha)
+        if self.full_redraw or ((self.game_over or self.win) and fade != self.drawn_fade):
+            self.draw_board()  # The fade effect covers the whole screen
+            return True
+
+        now = pygame.time.get_ticks()
+        dirty_rects = []
+        for i, j in self.visible_cells():
+            value = self.game.get_value(i, j)
+            changed = self.drawn_cells.get((i, j), 0) != value
+            if changed and value is not None:
+                self.tile_animations[(i, j)] = Animation(now, TILE_POP_TIME)
+            animation = self.tile_animations.get((i, j))
+            if changed or animation:
+                rect_x, rect_y = self.tile_position(j, i)
+                rect = pygame.Rect(rect_x, rect_y, self.tile_size, self.tile_size)
+                self.screen.fill(self.colors["board color"], rect)  # Clear the rounded corners
+                scale = 0.6 + 0.4 * animation.progress(now) if animation else 1.0
+                self.draw_tile(value, j, i, scale)
+                self.drawn_cells[(i, j)] = value
+                dirty_rects.append(rect)
+                if animation and animation.done(now):
+                    del self.tile_animations[(i, j)]
+
+        hud = (self.game.player_score, max(self.high_score, self.game.player_score), self.status_text())
+        if hud != self.drawn_hud:
+            # The texts of the last frame are cleared too: they can be wider than the HUD areas
+            for rect in self.hud_rects() + self.drawn_hud_texts:
+                self.screen.fill(self.colors["board color"], rect)
+                dirty_rects.append(rect)
+            self.draw_score()
+            dirty_rects.extend(self.drawn_hud_texts)
+            self.drawn_hud = hud
+
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        return bool(dirty_rects)
+
     def update_offsets(self):
         """
-        Update the offsets to center the game board within the window.
+        Update the offsets to center the game board within the window
+        (the score above it and the hint under it take the same height).
         """
         self.offset_x = (self.window_width - self.width) // 2
-        self.offset_y = (self.window_height - self.height) // 2 + self.score_height
+        self.offset_y = (self.window_height - self.height) // 2
 
 
 
@@ -162,7 +361,10 @@ class Game2048GUI:
         Handle user input for game moves.
         :param event: Pygame event object.
         """
-        if event.type == pygame.KEYDOWN:
+        if event.type == pygame.KEYDOWN and self.replay is not None:
+            self.scrub_handler(event)
+        elif event.type == pygame.KEYDOWN:
+            self.hint = None
             if event.key == pygame.K_UP:
                 self.game.to_up()
             elif event.key == pygame.K_DOWN:
@@ -175,7 +377,68 @@ class Game2048GUI:
                 self.game.undo()
             elif event.key == pygame.K_r:
                 self.game.redo()
-                
+            elif event.key in (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d):
+                self.scroll_key(event.key)
+            elif event.key == pygame.K_h and (self.game.rows, self.game.cols) == (4, 4):
+                self.request_hint()
+
+    def request_hint(self):
+        """
+        Look for the best move in a thread, which posts a HINT_EVENT when it is done.
+        A search already running is left to finish: its hint is dropped if the board changed meanwhile.
+        """
+        from Solver import pack_game
+        if self.hint_search is not None and self.hint_search.is_alive():
+            return
+        self.hint_search = threading.Thread(target=self.search_hint, args=(pack_game(self.game),), daemon=True)
+        self.hint_search.start()
+
+    def search_hint(self, board):
+        """
+        Search the best move for a packed board and post it as a HINT_EVENT (runs in the hint thread).
+        """
+        from Solver import ExpectimaxSolver
+        if self.hint_solver is None:
+            self.hint_solver = ExpectimaxSolver()  # Builds the heuristic tables, which takes a while
+        hint = self.hint_solver.best_move_for_board(board, HINT_TIME_BUDGET)
+        pygame.event.post(pygame.event.Event(HINT_EVENT, board=board, hint=hint))
+
+    def show_hint(self, event):
+        """
+        Show the move of a HINT_EVENT, unless the board changed since the search started.
+        """
+        from Solver import pack_game
+        if event.board == pack_game(self.game):
+            self.hint = event.hint
+
+    def scrub_handler(self, event):
+        """
+        Move through the replay with the keyboard.
+        :param event: Pygame KEYDOWN event.
+        """
+        steps = {
+            pygame.K_LEFT: -1,
+            pygame.K_RIGHT: 1,
+            pygame.K_DOWN: -self.replay.checkpoint_interval,
+            pygame.K_UP: self.replay.checkpoint_interval,
+        }
+        if event.key in steps:
+            self.replay.seek(self.replay.position + steps[event.key])
+        elif event.key == pygame.K_HOME:
+            self.replay.seek(0)
+        elif event.key == pygame.K_END:
+            self.replay.seek(len(self.replay))
+        elif event.key in (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d):
+            self.scroll_key(event.key)
+
+    def scroll_key(self, key):
+        """
+        Scroll the viewport of big boards by half a view with W, A, S or D.
+        """
+        delta_i = {pygame.K_w: -1, pygame.K_s: 1}.get(key, 0) * max(1, self.view_rows // 2)
+        delta_j = {pygame.K_a: -1, pygame.K_d: 1}.get(key, 0) * max(1, self.view_cols // 2)
+        self.scroll(delta_i, delta_j)
+
     def draw_fade_effect(self, state: bool):
         """
         if you pass the state as True it means player has won
@@ -189,45 +452,106 @@ class Game2048GUI:
         text = "You Win!" if state else "Game Over"
         text_color = self.colors["win text"] if state else self.colors["game over text"]
         
-        win_text = self.font.render(text, True, text_color)
+        win_text = self.hud_font.render(text, True, text_color)
         win_text.set_alpha(self.end_game_text_alpha)
         win_rect = win_text.get_rect(center=(self.window_width // 2, self.window_height // 2))
         self.screen.blit(win_text, win_rect)
     
+    def handle_event(self, event):
+        """
+        Handle one pygame event.
+        """
+        if event.type == pygame.QUIT:
+            if self.show_stats:
+                print(self.frame_stats())
+            pygame.quit()
+            sys.exit()
+        elif event.type == pygame.VIDEORESIZE:  # Window resize event
+            self.window_width, self.window_height = event.w, event.h
+            self.screen = pygame.display.set_mode((self.window_width, self.window_height), pygame.RESIZABLE)
+            self.update_layout()  # Update tile size, viewport and board position
+            self.tile_cache.clear()
+            self.full_redraw = True
+        elif event.type == HINT_EVENT:
+            self.show_hint(event)
+
+        if not self.game_over and not self.win:  # Only handle input if game is not over or won
+            if event.type == pygame.KEYDOWN and self.pending_key_time is None:
+                self.pending_key_time = time.perf_counter()
+            self.keyEvent_handler(event)
+
+    def update_end_game(self):
+        """
+        Start the end game animation when the game is won or lost, and move the fade effect on.
+        The fade waits END_GAME_DELAY ms without blocking the event queue.
+        """
+        now = pygame.time.get_ticks()
+        if self.replay is not None:
+            return  # A replay is watched to its end, without the end game overlay
+        if not self.game_over and not self.win:
+            if self.game.check_game_over():
+                self.game_over = True
+            if self.game.check_win():
+                self.win = True
+            if self.game_over or self.win:
+                layer_time = 1000 * 150 // FADE_LAYER_SPEED
+                text_time = 1000 * 255 // FADE_TEXT_SPEED
+                self.fade_animation = Animation(now, layer_time + text_time, delay=END_GAME_DELAY)
+
+        if self.fade_animation:
+            elapsed = self.fade_animation.elapsed(now)
+            self.end_game_layer_alpha = min(150, elapsed * FADE_LAYER_SPEED // 1000)
+            layer_time = 1000 * 150 // FADE_LAYER_SPEED
+            self.end_game_text_alpha = min(255, max(0, elapsed - layer_time) * FADE_TEXT_SPEED // 1000)
+
+    def is_animating(self):
+        """
+        Check if the next frames will differ even without any input.
+        """
+        now = pygame.time.get_ticks()
+        fading = self.fade_animation is not None and not self.fade_animation.done(now)
+        return fading or bool(self.tile_animations)
+
+    def frame_stats(self):
+        """
+        Return a summary of the frame times and keypress-to-frame latencies.
+        """
+        lines = []
+        for name, samples in (("Frame time", self.frame_times), ("Keypress to frame", self.input_latencies)):
+            if samples:
+                ordered = sorted(samples)
+                p50 = ordered[len(ordered) // 2]
+                p99 = ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)]
+                lines.append(f"{name}: {len(ordered)} samples, mean {sum(ordered) / len(ordered):.2f} ms, "
+                             f"p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {ordered[-1]:.2f} ms")
+        return "\n".join(lines)
+
     def run(self):
         """
         Run the GUI for the 2048 game.
+        The loop sleeps in pygame.event.wait while nothing is animating, and runs at self.fps otherwise.
         """
         self.initialize_pygame()
+        self.clock = pygame.time.Clock()
 
         while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.VIDEORESIZE:  # Window resize event
-                    self.window_width, self.window_height = event.w, event.h
-                    self.screen = pygame.display.set_mode((self.window_width, self.window_height), pygame.RESIZABLE)
-                    self.update_offsets()  # Update board position
-                    
-                if not self.game_over and not self.win:  # Only handle input if game is not over or won
-                    self.keyEvent_handler(event)
-
-            if self.game.check_game_over() and not self.game_over:
-                self.game_over = True
-                self.draw_board()
-                pygame.time.delay(1000)  # Wait for 1 second before starting the fade effect
+            if self.is_animating() or self.full_redraw:
+                events = pygame.event.get()
+            else:
+                events = [pygame.event.wait()] + pygame.event.get()  # Sleep until something happens
 
-            if self.game.check_win() and not self.win:
-                self.win = True
-                self.draw_board()
-                pygame.time.delay(1000)  # Wait for 1 second before starting the fade effect
+            for event in events:
+                self.handle_event(event)
+
+            self.update_end_game()
 
-            if self.win or self.game_over:
-                if self.end_game_layer_alpha < 150:
-                    self.end_game_layer_alpha += 3
-                elif self.end_game_text_alpha < 255:
-                    self.end_game_text_alpha += 15
+            frame_start = time.perf_counter()
+            if self.draw_changes():
+                frame_end = time.perf_counter()
+                self.frame_times.append((frame_end - frame_start) * 1000)
+                if self.pending_key_time is not None:
+                    self.input_latencies.append((frame_end - self.pending_key_time) * 1000)
+            self.pending_key_time = None
 
-            self.draw_board()
-            pygame.time.Clock().tick(30)  # Control the frame rate
\ No newline at end of file
+            if self.is_animating():
+                self.clock.tick(self.fps)  # Control the frame rate
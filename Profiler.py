@@ -0,0 +1,174 @@
+from array import array
+from collections import defaultdict
+import functools
+import time
+
+# Game2048 methods that are timed, inclusive of the methods they call (shift_tiles includes move_tiles,
+# merge, generate_new_tile and save_state).
+GAME_METHODS = ('shift_tiles', 'move_tiles', 'merge', 'generate_new_tile', 'check_game_over', 'check_win',
+                'save_state', 'snapshot_board', 'restore_board', 'apply_board_diff', 'undo', 'redo')
+# DoublyLinkedList methods that walk nodes (or lines), counted with the number of items each call returns.
+# The other list methods go through the position index and walk nothing. Rebuilding the list from a snapshot
+# in restore_board is counted as 'from_snapshot', with the number of nodes built.
+LIST_METHODS = ('row', 'column', 'occupied_rows', 'occupied_columns', 'snapshot', '__deepcopy__')
+HISTOGRAM_WIDTH = 40
+
+
+def percentile(ordered, fraction):
+    """
+    Return the value at the given fraction of a sorted sequence.
+    """
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class EngineProfiler:
+    """
+    Opt-in instrumentation of a Game2048: attach() replaces the hot methods of that one game (and of its
+    DoublyLinkedList) by timing wrappers stored on the instances, and detach() deletes them again.
+    Games without a profiler run the plain class methods, so disabled profiling costs nothing.
+    """
+
+    def __init__(self):
+        self.durations = defaultdict(lambda: array('Q'))  # Method name -> ns of every call
+        self.traversals = defaultdict(lambda: array('Q'))  # List method name -> nodes (or lines) walked by every call
+        self.games = []
+
+    def attach(self, game):
+        """
+        Start recording the calls of a game.
+        """
+        for name in GAME_METHODS:
+            setattr(game, name, self._timed(name, getattr(game, name)))
+        for name in ('restore_board', 'clear_board'):  # Both put a new list on the game
+            setattr(game, name, self._relisting(game, getattr(game, name), name == 'restore_board'))
+        if game.sparse_matrix is not None:
+            self._attach_list(game.sparse_matrix)
+        self.games.append(game)
+        return game
+
+    def detach(self, game):
+        """
+        Stop recording the calls of a game and give it back its plain methods.
+        """
+        for name in GAME_METHODS + ('clear_board',):
+            game.__dict__.pop(name, None)
+        if game.sparse_matrix is not None:
+            for name in LIST_METHODS:
+                game.sparse_matrix.__dict__.pop(name, None)
+        self.games.remove(game)
+
+    def _timed(self, name, method):
+        durations = self.durations[name]
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                durations.append(time.perf_counter_ns() - start)
+        return wrapper
+
+    def _relisting(self, game, method, from_snapshot):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            result = method(*args, **kwargs)
+            if game.sparse_matrix is not None and LIST_METHODS[0] not in game.sparse_matrix.__dict__:
+                if from_snapshot:
+                    self.traversals['from_snapshot'].append(game.sparse_matrix.size)
+                self._attach_list(game.sparse_matrix)
+            return result
+        return wrapper
+
+    def _attach_list(self, sparse_matrix):
+        for name in LIST_METHODS:
+            method = getattr(sparse_matrix, name)
+            setattr(sparse_matrix, name, self._walked(name, method))
+
+    def _walked(self, name, method):
+        traversals = self.traversals[name]
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            result = method(*args, **kwargs)
+            traversals.append(result.size if name == '__deepcopy__' else len(result))
+            return result
+        return wrapper
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for game in list(self.games):
+            self.detach(game)
+
+    def stats(self):
+        """
+        Return {method name: {'calls', 'total_ms', 'mean_us', 'p50_us', 'p99_us', 'max_us'}} of the timed
+        methods and {method name: {'calls', 'mean_nodes', 'p50_nodes', 'p99_nodes', 'max_nodes'}} of the
+        list methods.
+        """
+        timings = {}
+        for name, durations in self.durations.items():
+            if durations:
+                ordered = sorted(durations)
+                timings[name] = {
+                    'calls': len(ordered),
+                    'total_ms': sum(ordered) / 1e6,
+                    'mean_us': sum(ordered) / len(ordered) / 1e3,
+                    'p50_us': percentile(ordered, 0.5) / 1e3,
+                    'p99_us': percentile(ordered, 0.99) / 1e3,
+                    'max_us': ordered[-1] / 1e3,
+                }
+        walks = {}
+        for name, lengths in self.traversals.items():
+            if lengths:
+                ordered = sorted(lengths)
+                walks[name] = {
+                    'calls': len(ordered),
+                    'mean_nodes': sum(ordered) / len(ordered),
+                    'p50_nodes': percentile(ordered, 0.5),
+                    'p99_nodes': percentile(ordered, 0.99),
+                    'max_nodes': ordered[-1],
+                }
+        return timings, walks
+
+    def histogram(self, name):
+        """
+        Return the call times of a method as text, one line per power of two of microseconds.
+        """
+        buckets = defaultdict(int)
+        for duration in self.durations.get(name, ()):
+            buckets[max(0, (duration // 1000).bit_length())] += 1
+        if not buckets:
+            return ""
+        peak = max(buckets.values())
+        lines = []
+        for bucket in range(min(buckets), max(buckets) + 1):
+            count = buckets.get(bucket, 0)
+            low = 0 if bucket == 0 else 1 << (bucket - 1)
+            bar = '#' * (count * HISTOGRAM_WIDTH // peak)
+            lines.append(f"\t{'<1' if bucket == 0 else f'{low}-{2 * low}':>12} us {count:9} {bar}")
+        return "\n".join(lines)
+
+    def summary(self, histograms=('shift_tiles',)):
+        """
+        Return a report of the timings, the list traversal lengths and the histograms of some methods.
+        """
+        timings, walks = self.stats()
+        lines = [f"{'method':18} {'calls':>9} {'total ms':>10} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'max us':>9}"]
+        for name, stat in sorted(timings.items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{name:18} {stat['calls']:9} {stat['total_ms']:10.1f} {stat['mean_us']:9.1f} "
+                         f"{stat['p50_us']:9.1f} {stat['p99_us']:9.1f} {stat['max_us']:9.1f}")
+        if walks:
+            lines.append("")
+            lines.append(f"{'list method':18} {'calls':>9} {'mean nodes':>10} {'p50':>9} {'p99':>9} {'max':>9}")
+            for name, stat in sorted(walks.items()):
+                lines.append(f"{name:18} {stat['calls']:9} {stat['mean_nodes']:10.1f} {stat['p50_nodes']:9} "
+                             f"{stat['p99_nodes']:9} {stat['max_nodes']:9}")
+        for name in histograms:
+            if name in timings:
+                lines.append("")
+                lines.append(f"{name} call times:")
+                lines.append(self.histogram(name))
+        return "\n".join(lines)
@@ -0,0 +1,278 @@
+import mmap
+import os
+import struct
+
+# A record file is FILE_MAGIC followed by games, each stored as:
+#   header          GAME_HEADER: rows, cols, seed (NO_SEED if unknown), number of moves, number of initial tiles,
+#                   score when recording started
+#   initial tiles   INITIAL_TILE for every tile on the board when recording started: cell index, exponent
+#   moves           one little-endian code of move_width(rows, cols) bytes per move:
+#                   bits 0-1 direction, bit 2 spawned a 4 (else a 2), bits 3+ cell index of the spawned tile
+# On a 4x4 board a move takes one byte. Moves have a fixed width, so move K of a game is found without decoding
+# the moves before it, and a whole game is skipped by reading its header only.
+# The number of moves in the header is kept up to date as moves are written, so a session killed mid-game
+# leaves at most a part of a game at the end of the file: readers skip it and appending writers cut it off.
+
+FILE_MAGIC = b'2048REC\x02'  # The last byte is the format version
+GAME_HEADER = struct.Struct('<HHQIHQ')
+INITIAL_TILE = struct.Struct('<IB')
+NO_SEED = (1 << 64) - 1
+DIRECTIONS = ('left', 'right', 'up', 'down')
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+MOVES_FIELD_OFFSET = 12  # Offset of the number of moves in GAME_HEADER
+
+
+def move_width(rows, cols):
+    """
+    Return the number of bytes of a move code on a rows x cols board.
+    """
+    bits = 3 + max(1, (rows * cols - 1).bit_length())
+    return (bits + 7) // 8
+
+
+def encode_move(direction, spawn, cols):
+    """
+    Pack a move and the tile spawned after it into an integer code.
+    :param spawn: (value, i, j) of the spawned tile.
+    """
+    value, i, j = spawn
+    return DIRECTION_CODES[direction] | ((value == 4) << 2) | ((i * cols + j) << 3)
+
+
+def decode_move(code, cols):
+    """
+    Unpack a move code.
+    :return: (direction, (value, i, j) of the spawned tile)
+    """
+    i, j = divmod(code >> 3, cols)
+    return DIRECTIONS[code & 3], (4 if code & 4 else 2, i, j)
+
+
+class GameRecordWriter:
+    """
+    Streams games to a record file while they are played. The writer listens to the game's events:
+    every move is written as soon as it is made, an undo takes the last move back and a redo puts it again.
+    An undo past the start of the recording (or the redo of a move undone there) changes the board to one
+    the recorded moves don't lead to, so the game is recorded again from that board.
+    """
+
+    def __init__(self, path, append=False):
+        """
+        Open a record file.
+        :param append: Add games to an existing file instead of starting a new one. The unfinished game
+                       of a session that was killed, if any, is cut off first.
+        """
+        if append and os.path.exists(path):
+            with GameRecordReader(path) as reader:
+                end = reader.complete_end()
+            self.file = open(path, 'r+b')
+            self.file.truncate(end)
+            self.file.seek(end)
+        else:
+            self.file = open(path, 'w+b')
+            self.file.write(FILE_MAGIC)
+        self.game = None
+        self.header_offset = None  # Position of the header of the game being recorded
+        self.width = 0
+        self.moves = 0
+        self.undone = []  # Codes of the undone moves, for redo
+
+    def record(self, game, seed=None):
+        """
+        Start recording a game from its current board; the previous game (if any) is finished.
+        :param seed: The seed of the game's rng, stored for reference (None = unknown).
+        """
+        self.finish()
+        self.game = game
+        self.width = move_width(game.rows, game.cols)
+        self.header_offset = self.file.tell()
+        self.write_header(seed)
+        game.add_listener(self.on_game_event)
+
+    def write_header(self, seed):
+        """
+        Write the header and the initial tiles of the game at header_offset, from its current board and score.
+        """
+        game = self.game
+        self.moves = 0
+        self.undone = []
+        tiles = [(value, i, j) for i in range(game.rows) for j in range(game.cols)
+                 for value in (game.get_value(i, j),) if value]
+        self.file.seek(self.header_offset)
+        self.file.truncate()
+        self.file.write(GAME_HEADER.pack(game.rows, game.cols, NO_SEED if seed is None else seed, 0, len(tiles),
+                                         game.player_score))
+        for value, i, j in tiles:
+            self.file.write(INITIAL_TILE.pack(i * game.cols + j, value.bit_length() - 1))
+
+    def on_game_event(self, event):
+        """
+        Write, take back or put back a move.
+        """
+        if event == 'move':
+            code = encode_move(self.game.last_direction, self.game.last_spawn, self.game.cols)
+            self.file.write(code.to_bytes(self.width, 'little'))
+            self.moves += 1
+            self.undone = []
+            self.write_moves()
+        elif event == 'undo':
+            if not self.moves:
+                self.write_header(None)  # Back past the start: the seed doesn't lead to this board
+                return
+            self.file.seek(-self.width, os.SEEK_CUR)
+            self.undone.append(self.file.read(self.width))
+            self.file.seek(-self.width, os.SEEK_CUR)
+            self.file.truncate()
+            self.moves -= 1
+            self.write_moves()
+        elif event == 'redo':
+            if not self.undone:
+                self.write_header(None)
+                return
+            self.file.write(self.undone.pop())
+            self.moves += 1
+            self.write_moves()
+
+    def write_moves(self):
+        """
+        Write the number of moves in the header of the game being recorded. Seeking there and back flushes
+        the moves to the file first, so the header never counts moves that aren't written.
+        """
+        end = self.file.tell()
+        self.file.seek(self.header_offset + MOVES_FIELD_OFFSET)
+        self.file.write(struct.pack('<I', self.moves))
+        self.file.seek(end)
+
+    def finish(self):
+        """
+        Stop recording the game; the file already holds all of it.
+        """
+        if self.game is None:
+            return
+        self.game.remove_listener(self.on_game_event)
+        self.file.flush()
+        self.game = None
+
+    def close(self):
+        self.finish()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameRecord:
+    """
+    One game of a record file, read in place from the file's memory map.
+    """
+
+    def __init__(self, data, offset):
+        """
+        :param data: The memory map (or bytes) of the file.
+        :param offset: Position of the game header.
+        """
+        self.rows, self.cols, seed, self.moves, self.tile_count, self.score = GAME_HEADER.unpack_from(data, offset)
+        if not self.rows or not self.cols or self.tile_count > self.rows * self.cols:
+            raise ValueError(f"The game header at byte {offset} is corrupt.")
+        self.seed = None if seed == NO_SEED else seed
+        self.data = data
+        self.offset = offset
+        self.width = move_width(self.rows, self.cols)
+        self.tiles_offset = offset + GAME_HEADER.size
+        self.moves_offset = self.tiles_offset + self.tile_count * INITIAL_TILE.size
+        self.end = self.moves_offset + self.moves * self.width
+
+    def initial_tiles(self):
+        """
+        Return the tiles of the board when recording started as (value, i, j) tuples.
+        """
+        tiles = []
+        for k in range(self.tile_count):
+            cell, exponent = INITIAL_TILE.unpack_from(self.data, self.tiles_offset + k * INITIAL_TILE.size)
+            tiles.append((1 << exponent, *divmod(cell, self.cols)))
+        return tiles
+
+    def move(self, k):
+        """
+        Return move k as (direction, (value, i, j) of the spawned tile), without reading the moves before it.
+        """
+        if not 0 <= k < self.moves:
+            raise IndexError(f"Move {k} is out of range.")
+        start = self.moves_offset + k * self.width
+        return decode_move(int.from_bytes(self.data[start:start + self.width], 'little'), self.cols)
+
+    def __len__(self):
+        return self.moves
+
+    def __iter__(self):
+        data, width, cols = self.data, self.width, self.cols
+        for start in range(self.moves_offset, self.end, width):
+            yield decode_move(int.from_bytes(data[start:start + width], 'little'), cols)
+
+    def __repr__(self):
+        return f"GameRecord({self.rows}x{self.cols}, {self.moves} moves, seed {self.seed})"
+
+
+class GameRecordReader:
+    """
+    Reads a record file through a memory map: only the pages of the games and moves that are
+    looked at are loaded, so files with millions of games can be scanned or sampled cheaply.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(FILE_MAGIC)] != FILE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a game record file.")
+        self.offsets = None  # Header positions of the games, found on first use by game()
+
+    def __iter__(self):
+        """
+        Iterate over the games, hopping from header to header. A game that doesn't fit in the rest of the
+        file was being recorded when its session was killed: it is skipped.
+        """
+        offset = len(FILE_MAGIC)
+        while offset + GAME_HEADER.size <= len(self.data):
+            record = GameRecord(self.data, offset)
+            if record.end > len(self.data):
+                break
+            yield record
+            offset = record.end
+
+    def complete_end(self):
+        """
+        Return the position after the last complete game: anything after it is an unfinished game.
+        """
+        offsets = self.game_offsets()
+        return GameRecord(self.data, offsets[-1]).end if offsets else len(FILE_MAGIC)
+
+    def game_offsets(self):
+        """
+        Return the header positions of all games, found once by hopping over the headers.
+        """
+        if self.offsets is None:
+            self.offsets = [record.offset for record in self]
+        return self.offsets
+
+    def game(self, n):
+        """
+        Return game n of the file.
+        """
+        return GameRecord(self.data, self.game_offsets()[n])
+
+    def __len__(self):
+        return len(self.game_offsets())
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
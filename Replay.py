@@ -0,0 +1,91 @@
+from Game import Game2048
+import random
+
+
+class GameReplay:
+    """
+    Rebuilds the state of a played game after any number of moves. The moves are replayed with their
+    recorded spawns, and the board and score are stored every checkpoint_interval moves, so seeking
+    replays at most checkpoint_interval moves from the nearest checkpoint instead of starting at move 0.
+    """
+
+    def __init__(self, rows, cols, initial_tiles, moves, checkpoint_interval=64, backend='auto', initial_score=0):
+        """
+        Replay a whole game once to build its checkpoints, then go back to move 0.
+        :param initial_tiles: The tiles of the board before the first move, as (value, i, j).
+        :param moves: A sequence of (direction, (value, i, j) of the spawned tile).
+        :param checkpoint_interval: Number of moves between two stored states.
+        :param initial_score: The score before the first move (not 0 for games recorded from the middle).
+        """
+        self.moves = moves
+        self.checkpoint_interval = checkpoint_interval
+        self.game = Game2048(rows, cols, backend=backend, undo_memory_budget=0, initial_tiles=0)
+        for value, i, j in initial_tiles:
+            self.game.place_tile(value, i, j)
+        self.game.player_score = initial_score
+        self.position = 0  # Number of moves played on self.game
+
+        self.checkpoints = [(self.game.snapshot_board(), initial_score)]  # (board snapshot, player_score) at k * interval
+        for k in range(len(moves)):
+            self.play(k)
+            if (k + 1) % checkpoint_interval == 0:
+                self.checkpoints.append((self.game.snapshot_board(), self.game.player_score))
+        self.seek(0)
+
+    @classmethod
+    def from_record(cls, record, checkpoint_interval=64, backend='auto'):
+        """
+        Replay a game of a record file (a Record.GameRecord).
+        """
+        return cls(record.rows, record.cols, record.initial_tiles(), list(record), checkpoint_interval, backend,
+                   record.score)
+
+    @classmethod
+    def from_seed(cls, rows, cols, seed, directions, checkpoint_interval=64, backend='auto'):
+        """
+        Replay a game played by Game2048(rows, cols, backend, rng=random.Random(seed)): the spawns are drawn
+        again from the same seed (every backend spawns the same tiles from a seed).
+        Directions that didn't move the board are skipped, like in the game.
+        """
+        game = Game2048(rows, cols, backend=backend, undo_memory_budget=0, rng=random.Random(seed))
+        initial_tiles = [(value, i, j) for i in range(rows) for j in range(cols)
+                         for value in (game.get_value(i, j),) if value]
+        moves = []
+        for direction in directions:
+            game.shift_tiles(direction)
+            if game.has_moved:
+                moves.append((direction, game.last_spawn))
+        return cls(rows, cols, initial_tiles, moves, checkpoint_interval, backend)
+
+    def play(self, k):
+        """
+        Play move k on the game, with its recorded spawn.
+        """
+        direction, spawn = self.moves[k]
+        self.game.next_spawn = spawn
+        self.game.shift_tiles(direction)
+        if not self.game.has_moved:
+            raise ValueError(f"Move {k} ({direction}) doesn't change the board; the replay is out of sync.")
+        self.position = k + 1
+
+    def seek(self, k):
+        """
+        Bring the game to its state after k moves.
+        :return: The game.
+        """
+        k = max(0, min(len(self.moves), k))
+        if not self.position <= k < self.position + self.checkpoint_interval:
+            checkpoint = k // self.checkpoint_interval
+            snapshot, score = self.checkpoints[checkpoint]
+            self.game.restore_board(snapshot)
+            self.game.player_score = score
+            self.position = checkpoint * self.checkpoint_interval
+        while self.position < k:
+            self.play(self.position)
+        return self.game
+
+    def __len__(self):
+        return len(self.moves)
+
+    def __repr__(self):
+        return f"GameReplay({len(self.moves)} moves, at move {self.position})"
@@ -0,0 +1,172 @@
+from DataStructure.DenseBoard import DenseBoard
+from Game import BACKENDS, Game2048
+from array import array
+import random
+import struct
+import sys
+import zlib
+
+# A saved game is FILE_MAGIC + the format version + a zlib compressed body:
+#   GAME_HEADER     rows, cols, backend (index in BACKENDS), player_score, biggest_number, undo budget,
+#                   number of undo entries, number of redo entries, flags (HAS_RNG)
+#   board           rows * cols bytes of tile exponents, row by row (0 = empty cell)
+#   rng             if HAS_RNG: RNG_STATE (the Mersenne Twister words and position) and GAUSS_NEXT
+#   journal         undo entries from the oldest, then redo entries in the journal's order; each is
+#                   ENTRY_HEADER (score delta, number of changed cells), the changed cell indexes as
+#                   little-endian uint32, their old exponents and their new exponents
+# The board and the history are stored the same way for every backend, so no object graph is pickled
+# and a game can be loaded on another backend.
+
+FILE_MAGIC = b'2048SAV'
+VERSION = 1
+GAME_HEADER = struct.Struct('<HHBqIQIIB')
+RNG_STATE = struct.Struct('<625I')
+GAUSS_NEXT = struct.Struct('<?d')
+ENTRY_HEADER = struct.Struct('<qI')
+HAS_RNG = 1
+
+
+def canonical_history(game):
+    """
+    Return the undo and redo entries of a game with board deltas in the exponent format of DenseBoard
+    (changed cells, old exponents, new exponents), whatever the backend is.
+    """
+    board_class = game.board_class()
+    exponents = lambda snapshot: board_class.snapshot_to_exponents(snapshot, game.rows, game.cols)
+    current = game.snapshot_board()
+
+    undo_entries = []
+    after = current
+    for board_delta, score_delta in reversed(game.journal.undo_entries):
+        before = board_class.apply_snapshot_diff(after, board_delta, backward=True)
+        undo_entries.append((DenseBoard.snapshot_diff(exponents(before), exponents(after)), score_delta))
+        after = before
+    undo_entries.reverse()
+
+    redo_entries = []
+    before = current
+    for board_delta, score_delta in reversed(game.journal.redo_entries):
+        after = board_class.apply_snapshot_diff(before, board_delta)
+        redo_entries.append((DenseBoard.snapshot_diff(exponents(before), exponents(after)), score_delta))
+        before = after
+    redo_entries.reverse()
+    return undo_entries, redo_entries
+
+
+def backend_history(game, undo_entries, redo_entries):
+    """
+    Turn entries made by canonical_history back into board deltas of the game's backend.
+    """
+    board_class = game.board_class()
+    snapshot = lambda exponents: board_class.snapshot_from_exponents(exponents, game.rows, game.cols)
+    current = board_class.snapshot_to_exponents(game.snapshot_board(), game.rows, game.cols)
+
+    backend_undo = []
+    after = current
+    for delta, score_delta in reversed(undo_entries):
+        before = DenseBoard.apply_snapshot_diff(after, delta, backward=True)
+        backend_undo.append((board_class.snapshot_diff(snapshot(before), snapshot(after)), score_delta))
+        after = before
+    backend_undo.reverse()
+
+    backend_redo = []
+    before = current
+    for delta, score_delta in reversed(redo_entries):
+        after = DenseBoard.apply_snapshot_diff(before, delta)
+        backend_redo.append((board_class.snapshot_diff(snapshot(before), snapshot(after)), score_delta))
+        before = after
+    backend_redo.reverse()
+    return backend_undo, backend_redo
+
+
+def dumps(game, include_rng=True):
+    """
+    Serialize a game: board, score, undo/redo history, rng state and biggest_number.
+    :param include_rng: Store the rng state (2.5 KB) so the loaded game spawns the same tiles as the saved one
+                        would have (the spawn only depends on the rng and the empty cells, see FreeCells);
+                        without it the loaded game gets a fresh random.Random.
+    :return: The saved game as bytes.
+    """
+    undo_entries, redo_entries = canonical_history(game)
+    body = [GAME_HEADER.pack(game.rows, game.cols, BACKENDS.index(game.backend), game.player_score,
+                             game.biggest_number, game.journal.memory_budget, len(undo_entries),
+                             len(redo_entries), HAS_RNG if include_rng else 0),
+            game.board_class().snapshot_to_exponents(game.snapshot_board(), game.rows, game.cols)]
+
+    if include_rng:
+        _, words, gauss_next = game.rng.getstate()
+        body.append(RNG_STATE.pack(*words))
+        body.append(GAUSS_NEXT.pack(gauss_next is not None, gauss_next or 0.0))
+
+    for (changed, old, new), score_delta in undo_entries + redo_entries:
+        if sys.byteorder == 'big':
+            changed = array('I', changed)
+            changed.byteswap()
+        body.extend((ENTRY_HEADER.pack(score_delta, len(changed)), changed.tobytes(), old, new))
+
+    return FILE_MAGIC + bytes([VERSION]) + zlib.compress(b''.join(body))
+
+
+def loads(data, audio=None):
+    """
+    Rebuild a game saved by dumps.
+    :param audio: An audio backend for the loaded game (see Game2048).
+    :return: A new Game2048.
+    """
+    if data[:len(FILE_MAGIC)] != FILE_MAGIC:
+        raise ValueError("Not a saved 2048 game.")
+    version = data[len(FILE_MAGIC)]
+    if version != VERSION:
+        raise ValueError(f"Unsupported save format version {version}.")
+    body = zlib.decompress(data[len(FILE_MAGIC) + 1:])
+
+    (rows, cols, backend, player_score, biggest_number, memory_budget,
+     undo_count, redo_count, flags) = GAME_HEADER.unpack_from(body)
+    offset = GAME_HEADER.size
+    exponents = body[offset:offset + rows * cols]
+    offset += rows * cols
+
+    rng = random.Random()
+    if flags & HAS_RNG:
+        words = RNG_STATE.unpack_from(body, offset)
+        offset += RNG_STATE.size
+        has_gauss, gauss_next = GAUSS_NEXT.unpack_from(body, offset)
+        offset += GAUSS_NEXT.size
+        rng.setstate((3, words, gauss_next if has_gauss else None))
+
+    entries = []
+    for _ in range(undo_count + redo_count):
+        score_delta, count = ENTRY_HEADER.unpack_from(body, offset)
+        offset += ENTRY_HEADER.size
+        changed = array('I', body[offset:offset + 4 * count])
+        if sys.byteorder == 'big':
+            changed.byteswap()
+        offset += 4 * count
+        old = body[offset:offset + count]
+        new = body[offset + count:offset + 2 * count]
+        offset += 2 * count
+        entries.append(((changed, old, new), score_delta))
+
+    game = Game2048(rows, cols, backend=BACKENDS[backend], undo_memory_budget=memory_budget, audio=audio, rng=rng,
+                    initial_tiles=0)
+    game.restore_board(game.board_class().snapshot_from_exponents(exponents, rows, cols))
+    game.player_score = player_score
+    game.biggest_number = biggest_number
+    game.journal.restore(*backend_history(game, entries[:undo_count], entries[undo_count:]))
+    return game
+
+
+def save(game, path, include_rng=True):
+    """
+    Write a game to a file (see dumps).
+    """
+    with open(path, 'wb') as file:
+        file.write(dumps(game, include_rng))
+
+
+def load(path, audio=None):
+    """
+    Read a game written by save.
+    """
+    with open(path, 'rb') as file:
+        return loads(file.read(), audio)
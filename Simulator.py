@@ -0,0 +1,242 @@
+from DataStructure.MoveCache import MoveCache
+from Game import BACKENDS, Game2048
+from collections import Counter
+from multiprocessing import Pool
+import argparse
+import random
+import time
+
+# Nothing in this module may import pygame or playsound: workers must start fast on display-less machines.
+
+DIRECTIONS = ('left', 'right', 'up', 'down')
+CORNER_ORDER = ('down', 'left', 'right', 'up')
+
+
+def random_policy(game, rng):
+    """
+    Pick any direction.
+    """
+    return rng.choice(DIRECTIONS)
+
+
+def corner_policy(game, rng):
+    """
+    Keep the big tiles in the bottom-left corner: prefer down, then left, then right, then up.
+    Illegal moves fall through to the next direction in the simulator.
+    """
+    return CORNER_ORDER
+
+
+def expectimax_policy(game, rng):
+    """
+    Let the expectimax solver pick the move (4x4 boards only), with a small time budget per move.
+    """
+    from Solver import best_move
+    return best_move(game, time_budget=0.02) or 'left'
+
+
+POLICIES = {
+    'random': random_policy,
+    'corner': corner_policy,
+    'expectimax': expectimax_policy,
+}
+
+
+def play_game(rows, cols, backend, policy, rng, profiler=None, move_cache=None):
+    """
+    Play one headless game until no move is possible.
+    :param policy: A callable (game, rng) -> direction, or -> a tuple of directions in order of preference.
+                   When none of the chosen moves changes anything, the directions are tried in random
+                   order so the game always goes on.
+    :param rng: A random.Random used by the policy and for the tile spawns.
+    :param profiler: A Profiler.EngineProfiler recording the game's calls, or None.
+    :param move_cache: A MoveCache shared with the other games of the same size and backend, or None.
+    :return: (score, biggest tile, number of moves)
+    """
+    game = Game2048(rows, cols, backend=backend, undo_memory_budget=0, rng=rng, move_cache=move_cache)
+    if profiler:
+        profiler.attach(game)
+    moves = 0
+    while not game.check_game_over():
+        choice = policy(game, rng)
+        preferred = (choice,) if isinstance(choice, str) else choice
+        for direction in preferred:
+            game.shift_tiles(direction)
+            if game.has_moved:
+                break
+        else:
+            others = list(DIRECTIONS)
+            rng.shuffle(others)
+            for direction in others:
+                game.shift_tiles(direction)
+                if game.has_moved:
+                    break
+        moves += 1
+
+    if profiler:
+        profiler.detach(game)
+    biggest = max(game.get_value(i, j) or 0 for i in range(rows) for j in range(cols))
+    return game.player_score, biggest, moves
+
+
+def play_chunk(task, profiler=None):
+    """
+    Worker entry point: play a chunk of games with an RNG seeded for this chunk,
+    so results don't depend on which worker picks up which chunk.
+    :param task: (seed, number of games, rows, cols, backend, policy, move cache capacity (0 = no cache))
+    :param profiler: A Profiler.EngineProfiler recording the games' calls, or None.
+    :return: (a list of (score, biggest tile, number of moves), (cache hits, misses, evictions))
+    """
+    seed, games, rows, cols, backend, policy, cache_capacity = task
+    rng = random.Random(seed)
+    move_cache = MoveCache(cache_capacity) if cache_capacity else None
+    results = [play_game(rows, cols, backend, policy, rng, profiler, move_cache) for _ in range(games)]
+    if move_cache is None:
+        return results, (0, 0, 0)
+    return results, (move_cache.hits, move_cache.misses, move_cache.evictions)
+
+
+class SimulationStats:
+    """
+    Aggregate results of a simulation, updated as chunks of games come back.
+    """
+
+    def __init__(self, score_bucket=1000):
+        """
+        :param score_bucket: Width of the buckets of the score distribution.
+        """
+        self.score_bucket = score_bucket
+        self.games = 0
+        self.total_score = 0
+        self.best_score = 0
+        self.total_moves = 0
+        self.score_distribution = Counter()  # Bucket start -> number of games
+        self.max_tiles = Counter()  # Biggest tile -> number of games
+        self.cache_hits = 0  # Move cache counters, summed over the chunks
+        self.cache_misses = 0
+        self.cache_evictions = 0
+        self.start_time = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, results, cache_counters=(0, 0, 0)):
+        """
+        Add the results of a chunk of games.
+        :param cache_counters: (hits, misses, evictions) of the chunk's move cache.
+        """
+        hits, misses, evictions = cache_counters
+        self.cache_hits += hits
+        self.cache_misses += misses
+        self.cache_evictions += evictions
+        for score, biggest, moves in results:
+            self.games += 1
+            self.total_score += score
+            self.best_score = max(self.best_score, score)
+            self.total_moves += moves
+            self.score_distribution[score // self.score_bucket * self.score_bucket] += 1
+            self.max_tiles[biggest] += 1
+        self.elapsed = time.perf_counter() - self.start_time
+
+    @property
+    def games_per_second(self):
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mean_score(self):
+        return self.total_score / self.games if self.games else 0.0
+
+    @property
+    def moves_per_game(self):
+        return self.total_moves / self.games if self.games else 0.0
+
+    def __str__(self):
+        lines = [
+            f"Games: {self.games} ({self.games_per_second:.1f} games/sec, {self.elapsed:.1f} s)",
+            f"Score: mean {self.mean_score:.1f}, best {self.best_score}",
+            f"Moves per game: {self.moves_per_game:.1f}",
+        ]
+        if self.cache_hits or self.cache_misses:
+            lookups = self.cache_hits + self.cache_misses
+            lines.append(f"Move cache: {self.cache_hits / lookups:.1%} hits ({self.cache_hits} hits, "
+                         f"{self.cache_misses} misses, {self.cache_evictions} evictions)")
+        lines.append("Max tile:")
+        for tile in sorted(self.max_tiles):
+            lines.append(f"\t{tile}\t{self.max_tiles[tile]}")
+        lines.append("Score distribution:")
+        for bucket in sorted(self.score_distribution):
+            lines.append(f"\t{bucket}-{bucket + self.score_bucket - 1}\t{self.score_distribution[bucket]}")
+        return "\n".join(lines)
+
+
+def simulate(games, policy=random_policy, workers=None, seed=0, rows=4, cols=4, backend=None,
+             chunk_size=100, on_progress=None, profiler=None, move_cache_size=0):
+    """
+    Play many headless games across a process pool.
+    :param games: Number of games to play.
+    :param policy: A picklable callable (game, rng) -> direction, or a name from POLICIES.
+    :param workers: Number of worker processes (None = one per CPU).
+    :param seed: Base seed; chunk k is seeded with seed + k.
+    :param backend: Board backend (None = 'auto', see Game2048.choose_backend).
+    :param chunk_size: Number of games a worker plays per task.
+    :param on_progress: Called with the SimulationStats after every finished chunk.
+    :param profiler: A Profiler.EngineProfiler recording the calls of every game. Its recordings can't
+                     come back from worker processes, so the games are then played in this process.
+    :param move_cache_size: Capacity of the MoveCache shared by the games of a chunk (0 = no cache).
+    :return: The final SimulationStats.
+    """
+    if isinstance(policy, str):
+        policy = POLICIES[policy]
+    if backend is None:
+        backend = Game2048.choose_backend(rows, cols)
+
+    tasks = []
+    for k, start in enumerate(range(0, games, chunk_size)):
+        tasks.append((seed + k, min(chunk_size, games - start), rows, cols, backend, policy, move_cache_size))
+
+    stats = SimulationStats()
+    if profiler:
+        for task in tasks:
+            stats.add(*play_chunk(task, profiler))
+            if on_progress:
+                on_progress(stats)
+        return stats
+    with Pool(workers) as pool:
+        for results, cache_counters in pool.imap_unordered(play_chunk, tasks):
+            stats.add(results, cache_counters)
+            if on_progress:
+                on_progress(stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play 2048 games headlessly and report aggregate results.")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rows', type=int, default=4)
+    parser.add_argument('--cols', type=int, default=4)
+    parser.add_argument('--backend', choices=BACKENDS, default=None)
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--profile', action='store_true',
+                        help="Time the engine calls (in a single process) and print a summary.")
+    parser.add_argument('--move-cache', type=int, default=0,
+                        help="Capacity of the move result cache shared by the games of a chunk (0 = off).")
+    args = parser.parse_args()
+
+    def report(stats):
+        print(f"{stats.games}/{args.games} games, {stats.games_per_second:.1f} games/sec, "
+              f"mean score {stats.mean_score:.1f}", flush=True)
+
+    profiler = None
+    if args.profile:
+        from Profiler import EngineProfiler
+        profiler = EngineProfiler()
+    stats = simulate(args.games, args.policy, args.workers, args.seed, args.rows, args.cols,
+                     args.backend, args.chunk_size, report, profiler, args.move_cache)
+    print(stats)
+    if profiler:
+        print(profiler.summary())
+
+
+if __name__ == '__main__':
+    main()
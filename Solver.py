@@ -0,0 +1,314 @@
+from DataStructure.BitBoard import BitBoard, ROW_MASK, move, transpose
+from Game import FOUR_PROBABILITY
+from concurrent.futures import ProcessPoolExecutor
+import time
+
+DIRECTIONS = ('left', 'right', 'up', 'down')
+
+# Heuristic weights (per row and per column of the board)
+LOST_PENALTY = 200000.0
+MONOTONICITY_POWER = 4.0
+MONOTONICITY_WEIGHT = 47.0
+SUM_POWER = 3.5
+SUM_WEIGHT = 11.0
+MERGES_WEIGHT = 700.0
+EMPTY_WEIGHT = 270.0
+
+_ROW_HEURISTIC = None  # row -> heuristic score of that row
+
+
+def _row_heuristic(exponents):
+    """
+    Score a single row (or column): empty cells, possible merges and monotonic rows are good,
+    big tiles in the middle of the board are bad.
+    """
+    total = 0.0
+    empty = 0
+    merges = 0
+    previous = 0
+    counter = 0
+    for exponent in exponents:
+        total += exponent ** SUM_POWER
+        if exponent == 0:
+            empty += 1
+        else:
+            if previous == exponent:
+                counter += 1
+            elif counter > 0:
+                merges += 1 + counter
+                counter = 0
+            previous = exponent
+    if counter > 0:
+        merges += 1 + counter
+
+    monotonicity_left = 0.0
+    monotonicity_right = 0.0
+    for k in range(1, 4):
+        if exponents[k - 1] > exponents[k]:
+            monotonicity_left += exponents[k - 1] ** MONOTONICITY_POWER - exponents[k] ** MONOTONICITY_POWER
+        else:
+            monotonicity_right += exponents[k] ** MONOTONICITY_POWER - exponents[k - 1] ** MONOTONICITY_POWER
+
+    return (LOST_PENALTY + EMPTY_WEIGHT * empty + MERGES_WEIGHT * merges
+            - MONOTONICITY_WEIGHT * min(monotonicity_left, monotonicity_right) - SUM_WEIGHT * total)
+
+
+def build_heuristic_table():
+    """
+    Build the 65536-entry row heuristic table once per process.
+    """
+    global _ROW_HEURISTIC
+    if _ROW_HEURISTIC is None:
+        _ROW_HEURISTIC = [_row_heuristic([(row >> shift) & 0xF for shift in (0, 4, 8, 12)])
+                          for row in range(ROW_MASK + 1)]
+
+
+def heuristic(board):
+    """
+    Score a packed board by its rows and its columns.
+    """
+    table = _ROW_HEURISTIC
+    columns = transpose(board)
+    return (table[board & ROW_MASK] + table[(board >> 16) & ROW_MASK]
+            + table[(board >> 32) & ROW_MASK] + table[(board >> 48) & ROW_MASK]
+            + table[columns & ROW_MASK] + table[(columns >> 16) & ROW_MASK]
+            + table[(columns >> 32) & ROW_MASK] + table[(columns >> 48) & ROW_MASK])
+
+
+def pack_game(game):
+    """
+    Return the packed 64-bit board of a 4x4 game, whatever its backend is.
+    """
+    if isinstance(game.board, BitBoard):
+        return game.board.state
+    if (game.rows, game.cols) != (BitBoard.rows, BitBoard.cols):
+        raise ValueError("The solver only supports 4x4 boards.")
+    board = BitBoard()
+    for i in range(game.rows):
+        for j in range(game.cols):
+            value = game.get_value(i, j)
+            if value:
+                board.add_tile(value, i, j)
+    return board.state
+
+
+def empty_shifts(board):
+    """
+    Return the bit offsets of the empty cells of a packed board.
+    """
+    return [shift for shift in range(0, 64, 4) if not (board >> shift) & 0xF]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class ExpectimaxSolver:
+    """
+    Pick moves with expectimax search over the tile spawns of Game2048.generate_new_tile
+    (a 2 or, with FOUR_PROBABILITY, a 4 on a random empty cell).
+    Boards are packed 64-bit integers, so the board itself is the transposition table key.
+    """
+
+    def __init__(self, max_depth=3, probability_threshold=0.0001, time_budget=None, workers=1):
+        """
+        :param max_depth: The deepest search, in spawns, used on nearly full boards.
+        :param probability_threshold: Chance nodes reached with a lower probability are not expanded.
+        :param time_budget: Default seconds per move (None = always finish the search).
+        :param workers: Number of processes searching the root tasks (1 = search in this process).
+                        Every root task gets its own transposition table in both modes, so the scores
+                        don't depend on which worker runs which task, or in what order.
+        """
+        build_heuristic_table()
+        self.max_depth = max_depth
+        self.probability_threshold = probability_threshold
+        self.time_budget = time_budget
+        self.workers = workers
+        self.pool = None
+        self.transposition_table = {}  # board -> (depth, value) of the root task being searched
+        self.deadline = None
+        self.nodes = 0
+        self.cache_hits = 0
+
+    def search_depth(self, board):
+        """
+        Search deeper when there are few empty cells: the branching factor is small
+        and the position is the most dangerous.
+        """
+        empty = len(empty_shifts(board))
+        return max(1, self.max_depth - (empty > 4) - (empty > 8))
+
+    def best_move(self, game, time_budget=None, depth=None):
+        """
+        Return the best direction for the game, or None if no move is possible.
+        :param game: A 4x4 Game2048 (any backend).
+        :param time_budget: Seconds to think (default: the solver's time_budget). The search deepens
+                            one spawn at a time and returns the result of the last finished depth.
+        :param depth: Search exactly this deep instead of using search_depth.
+        """
+        board = pack_game(game)
+        return self.best_move_for_board(board, time_budget, depth)
+
+    def best_move_for_board(self, board, time_budget=None, depth=None):
+        """
+        Same as best_move, for a packed board.
+        """
+        if time_budget is None:
+            time_budget = self.time_budget
+        self.deadline = time.time() + time_budget if time_budget is not None else None
+
+        best = None
+        depths = [depth] if depth else range(1, self.search_depth(board) + 1)
+        for search_depth in depths:
+            try:
+                scores = self.evaluate_moves(board, search_depth)
+            except SearchTimeout:
+                break
+            if scores:
+                best = max(scores, key=scores.get)
+        if best is None:
+            # Out of time before depth 1 finished: any legal move is better than none
+            best = next((direction for direction in DIRECTIONS if move(board, direction)[0] != board), None)
+        return best
+
+    def root_tasks(self, board, depth):
+        """
+        Split the search below the root into independent tasks, one per legal move. The spawns after a move
+        reach many boards in common (two spawns in either order), so they share the task's table.
+        :return: A list of (direction, spawns), spawns being a tuple of
+                 (weight, board after the spawn, depth left, probability).
+        """
+        tasks = []
+        for direction in DIRECTIONS:
+            new_board, _ = move(board, direction)
+            if new_board == board:
+                continue
+            shifts = empty_shifts(new_board)
+            spawns = []
+            for shift in shifts:
+                for exponent, spawn_probability in ((1, 1 - FOUR_PROBABILITY), (2, FOUR_PROBABILITY)):
+                    weight = spawn_probability / len(shifts)
+                    spawns.append((weight, new_board | (exponent << shift), depth - 1, weight))
+            tasks.append((direction, tuple(spawns)))
+        return tasks
+
+    def evaluate_moves(self, board, depth):
+        """
+        Return the expected score of every legal move of the board.
+        """
+        tasks = self.root_tasks(board, depth)
+        if self.workers > 1:
+            results = self.get_pool().map(_search_task_in_worker,
+                                          [(spawns, self.deadline) for _, spawns in tasks])
+        else:
+            results = (self.search_task(spawns) for _, spawns in tasks)
+
+        scores = {}
+        for (direction, _), value in zip(tasks, results):
+            if value is None:
+                raise SearchTimeout()
+            scores[direction] = value
+        return scores
+
+    def get_pool(self):
+        """
+        Start the worker processes on first use.
+        """
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_start_worker,
+                                            initargs=(self.max_depth, self.probability_threshold))
+        return self.pool
+
+    def close(self):
+        """
+        Stop the worker processes, if any.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search_task(self, spawns):
+        """
+        Search one root task with a new transposition table.
+        :param spawns: The spawns of the task, as made by root_tasks.
+        :return: The expected score of the task's move.
+        """
+        self.transposition_table = {}
+        value = 0.0
+        for weight, board, depth, probability in spawns:
+            value += weight * self.max_node(board, depth, probability)
+        return value
+
+    def max_node(self, board, depth, probability):
+        best = 0.0  # No move left: the game is lost
+        for direction in DIRECTIONS:
+            new_board, _ = move(board, direction)
+            if new_board != board:
+                best = max(best, self.chance_node(new_board, depth, probability))
+        return best
+
+    def chance_node(self, board, depth, probability):
+        self.nodes += 1
+        if depth <= 0 or probability < self.probability_threshold:
+            return heuristic(board)
+        if self.deadline is not None and not self.nodes & 0xF and time.time() > self.deadline:
+            raise SearchTimeout()
+
+        cached = self.transposition_table.get(board)
+        if cached is not None and cached[0] >= depth:
+            self.cache_hits += 1
+            return cached[1]
+
+        shifts = empty_shifts(board)
+        cell_probability = probability / len(shifts)
+        total = 0.0
+        for shift in shifts:
+            total += (1 - FOUR_PROBABILITY) * self.max_node(
+                board | (1 << shift), depth - 1, cell_probability * (1 - FOUR_PROBABILITY))
+            total += FOUR_PROBABILITY * self.max_node(
+                board | (2 << shift), depth - 1, cell_probability * FOUR_PROBABILITY)
+        value = total / len(shifts)
+
+        self.transposition_table[board] = (depth, value)
+        return value
+
+
+_worker_solver = None  # The solver of a worker process
+
+
+def _start_worker(max_depth, probability_threshold):
+    global _worker_solver
+    _worker_solver = ExpectimaxSolver(max_depth, probability_threshold)
+
+
+def _search_task_in_worker(task):
+    """
+    Search one root task in a worker process.
+    :param task: (spawns of the task, deadline from time.time() or None)
+    :return: The expected score of the task's move, or None if the deadline passed.
+    """
+    spawns, deadline = task
+    _worker_solver.deadline = deadline
+    try:
+        return _worker_solver.search_task(spawns)
+    except SearchTimeout:
+        return None
+
+
+_default_solver = None
+
+
+def best_move(game, time_budget=0.1):
+    """
+    Return the best direction for a 4x4 game with a shared solver, or None if no move is possible.
+    """
+    global _default_solver
+    if _default_solver is None:
+        _default_solver = ExpectimaxSolver()
+    return _default_solver.best_move(game, time_budget)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+import pygame
+
+MIN_TEXT_TILE_SIZE = 20  # Smaller tiles show only their color
+
+
+class TileCache:
+    """
+    Pre-rendered tile surfaces (rounded rectangle + number), so a frame only blits them
+    instead of drawing rectangles and rendering text for every tile.
+    Surfaces are keyed by (value, tile size, font) and the least recently used ones are evicted.
+    """
+
+    def __init__(self, colors, max_entries=128):
+        """
+        :param colors: The color table of Game2048GUI.
+        :param max_entries: How many surfaces to keep.
+        """
+        self.colors = colors
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def tile_colors(self, value):
+        """
+        Return (background color, text color) of a tile; values beyond the color table share one color.
+        """
+        if value is None:
+            return self.colors["empty cells color"], None
+        if value in self.colors:
+            return self.colors[value], self.colors["number colors"]
+        return self.colors["super tile"], self.colors["super tile text"]
+
+    def get(self, value, tile_size, font):
+        """
+        Return the surface of a tile, rendering it the first time.
+        :param value: Value of the tile (None for an empty cell).
+        :param tile_size: Width and height of the tile in pixels.
+        :param font: The pygame font of the numbers.
+        """
+        key = (value, tile_size, font)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.render(value, tile_size, font)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def render(self, value, tile_size, font):
+        background, text_color = self.tile_colors(value)
+        surface = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+        pygame.draw.rect(surface, background, (0, 0, tile_size, tile_size), border_radius=min(10, tile_size // 5))
+
+        if value and tile_size >= MIN_TEXT_TILE_SIZE:
+            text = font.render(str(value), True, text_color)
+            max_width = tile_size - 10
+            if text.get_width() > max_width:  # Long numbers are shrunk to fit the tile
+                height = text.get_height() * max_width // text.get_width()
+                text = pygame.transform.smoothscale(text, (max_width, max(height, 1)))
+            surface.blit(text, text.get_rect(center=(tile_size // 2, tile_size // 2)))
+        return surface
+
+    def clear(self):
+        """
+        Drop all surfaces, e.g. when the window is resized and tile sizes or fonts change.
+        """
+        self.surfaces.clear()
@@ -1,6 +1,74 @@
-from Game import Game2048
-from Graphic import Game2048GUI
+from Game import BACKENDS, Game2048
+import SaveState
+import argparse
+import os
 
-game = Game2048(4, 4)
-graphic = Game2048GUI(game)
-graphic.run()
\ No newline at end of file
+# Only the engine is imported up front: pygame, playsound and the simulator are loaded by the mode that needs them.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play 2048.")
+    parser.add_argument('--mode', choices=('gui', 'cli', 'headless'), default='gui')
+    parser.add_argument('--rows', type=int, default=4)
+    parser.add_argument('--cols', type=int, default=4)
+    parser.add_argument('--backend', choices=BACKENDS, default='auto', help="Board backend.")
+    parser.add_argument('--games', type=int, default=100, help="Number of games in headless mode.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes in headless mode.")
+    parser.add_argument('--record', default=None, help="Append the game to this record file (cli and gui modes).")
+    parser.add_argument('--resume', default=None, help="Continue the game saved in this file and save it on exit.")
+    parser.add_argument('--replay', default=None, help="Scrub through a game of this record file in the gui.")
+    parser.add_argument('--game', type=int, default=0, help="Game of the --replay file to show.")
+    parser.add_argument('--profile', action='store_true', help="Time the engine calls and print a summary on exit.")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile:
+        from Profiler import EngineProfiler
+        profiler = EngineProfiler()
+
+    if args.mode == 'headless':
+        from Simulator import simulate
+        print(simulate(args.games, workers=args.workers, rows=args.rows, cols=args.cols,
+                       backend=args.backend, profiler=profiler))
+        if profiler:
+            print(profiler.summary())
+        return
+
+    if args.replay:
+        from Record import GameRecordReader
+        from Replay import GameReplay
+        from Graphic import Game2048GUI
+        with GameRecordReader(args.replay) as reader:
+            replay = GameReplay.from_record(reader.game(args.game), backend=args.backend)
+        Game2048GUI(None, replay=replay).run()
+        return
+
+    if args.resume and os.path.exists(args.resume):
+        game = SaveState.load(args.resume)
+    else:
+        game = Game2048(args.rows, args.cols, backend=args.backend)
+    writer = None
+    if args.record:
+        from Record import GameRecordWriter
+        writer = GameRecordWriter(args.record, append=True)
+        writer.record(game)
+    if profiler:
+        profiler.attach(game)
+    try:
+        if args.mode == 'cli':
+            game.run()
+        else:
+            from Graphic import Game2048GUI
+            graphic = Game2048GUI(game)
+            graphic.run()
+    finally:
+        if writer is not None:
+            writer.close()  # Also runs on the sys.exit of the GUI
+        if args.resume:
+            SaveState.save(game, args.resume)
+        if profiler:
+            print(profiler.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+# The modules live at the repository root, which is not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIRECTIONS = ('left', 'right', 'up', 'down')
+
+
+def board(game):
+    """
+    Return the board of a game as rows of values (None = empty cell), the same on every backend.
+    """
+    return [[game.get_value(i, j) for j in range(game.cols)] for i in range(game.rows)]
+
+
+def play(game, rng, moves):
+    """
+    Play random moves drawn from rng.
+    """
+    for _ in range(moves):
+        game.shift_tiles(rng.choice(DIRECTIONS))
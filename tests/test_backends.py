@@ -0,0 +1,109 @@
+from conftest import DIRECTIONS, board
+from DataStructure.BitBoard import BitBoard, MAX_EXPONENT
+from Game import Game2048
+import random
+import pytest
+
+SIZES = [('bitboard', 4, 4), ('linked', 4, 4), ('dense', 4, 4), ('linked', 3, 5), ('dense', 3, 5)]
+
+
+def random_exponents(rng, rows, cols):
+    """
+    Return a board as rows of exponents (0 = empty), with small tiles so lines have merges.
+    """
+    return [[rng.choice((0, 0, 1, 1, 2, 3)) for _ in range(cols)] for _ in range(rows)]
+
+
+def game_from_exponents(backend, exponents):
+    game = Game2048(len(exponents), len(exponents[0]), backend=backend, initial_tiles=0)
+    for i, row in enumerate(exponents):
+        for j, exponent in enumerate(row):
+            if exponent:
+                game.place_tile(1 << exponent, i, j)
+    return game
+
+
+def shifted(backend, exponents, direction):
+    """
+    Return (board, score, has_moved) after shifting a board, without spawning a tile.
+    """
+    game = game_from_exponents(backend, exponents)
+    game.has_moved = False
+    game.move_tiles(direction)
+    return board(game), game.player_score, game.has_moved
+
+
+@pytest.mark.parametrize('rows, cols', [(4, 4), (3, 5)])
+def test_backends_shift_the_same_way(rows, cols):
+    backends = [backend for backend, r, c in SIZES if (r, c) == (rows, cols)]
+    rng = random.Random(rows * cols)
+    for _ in range(200):
+        exponents = random_exponents(rng, rows, cols)
+        for direction in DIRECTIONS:
+            results = [shifted(backend, exponents, direction) for backend in backends]
+            assert all(result == results[0] for result in results), (exponents, direction)
+
+
+@pytest.mark.parametrize('rows, cols', [(4, 4), (3, 5)])
+def test_batch_shifts_like_the_game(rows, cols):
+    np = pytest.importorskip('numpy')
+    import Batch
+
+    rng = random.Random(rows + cols)
+    boards = [random_exponents(rng, rows, cols) for _ in range(100)]
+    directions = [rng.choice(DIRECTIONS) for _ in boards]
+    batch, gains, moved = Batch.shift_boards(np.array(boards, dtype=np.uint8), directions)
+    for k, (exponents, direction) in enumerate(zip(boards, directions)):
+        game_board, score, has_moved = shifted('linked', exponents, direction)
+        expected = [[value.bit_length() - 1 if value else 0 for value in row] for row in game_board]
+        assert batch[k].tolist() == expected, (exponents, direction)
+        assert (gains[k], moved[k]) == (score, has_moved)
+
+
+def test_seeded_games_are_the_same_on_every_backend():
+    games = [Game2048(4, 4, backend=backend, rng=random.Random(7)) for backend in ('linked', 'bitboard', 'dense')]
+    rng = random.Random(8)
+    for _ in range(300):
+        direction = rng.choice(DIRECTIONS)
+        for game in games:
+            game.shift_tiles(direction)
+        assert all(board(game) == board(games[0]) for game in games)
+        assert all(game.player_score == games[0].player_score for game in games)
+
+
+def test_bitboard_refuses_tiles_above_its_cap():
+    game = Game2048(4, 4, backend='bitboard', initial_tiles=0)
+    game.place_tile(1 << MAX_EXPONENT, 0, 0)
+    with pytest.raises(ValueError):
+        game.place_tile(1 << (MAX_EXPONENT + 1), 0, 1)
+    with pytest.raises(ValueError):
+        BitBoard.snapshot_from_exponents(bytes([MAX_EXPONENT + 1] + [0] * 15))
+    assert board(game)[0][:2] == [1 << MAX_EXPONENT, None]
+
+
+def test_dense_max_value_follows_moves_undo_and_edits():
+    rng = random.Random(4)
+    game = Game2048(5, 5, backend='dense', rng=random.Random(5))
+    for step in range(400):
+        game.shift_tiles(rng.choice(DIRECTIONS))
+        if step % 7 == 0:
+            game.undo()
+        if step % 11 == 0:
+            game.redo()
+        if step % 17 == 0:
+            i, j = rng.randrange(5), rng.randrange(5)
+            if game.get_value(i, j) == game.board.max_value():
+                game.board.delete_tile(i, j)  # The biggest tile goes away outside a move
+        expected = max((value for row in board(game) for value in row if value), default=0)
+        assert game.board.max_value() == expected
+        if game.check_game_over():
+            break
+
+    before = game.board.snapshot()
+    game.board.delete_tile(*next((i, j) for i in range(5) for j in range(5) if game.get_value(i, j) == expected))
+    game.board.add_tile(2, 0, 0)
+    changed, old, new = game.board.snapshot_diff(before, game.board.snapshot())
+    game.board.apply_diff((changed, new, old))  # Back to the board with the biggest tile
+    assert game.board.max_value() == expected
+    game.board.apply_diff((changed, old, new))  # And away from it again
+    assert game.board.max_value() == max((value for row in board(game) for value in row if value), default=0)
@@ -0,0 +1,74 @@
+from conftest import DIRECTIONS, play
+from Game import Game2048
+import os
+import random
+import time
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+pygame = pytest.importorskip('pygame')
+from Graphic import HINT_EVENT, HINT_TIME_BUDGET, TILE_POP_TIME, Game2048GUI
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def gui(monkeypatch):
+    monkeypatch.chdir(REPO)  # For the icon and the sounds
+    gui = Game2048GUI(Game2048(4, 4, backend='linked', rng=random.Random(1)))
+    gui.initialize_pygame()
+    yield gui
+    pygame.quit()
+
+
+def pixels(surface):
+    return pygame.image.tobytes(surface, 'RGB')
+
+
+def test_incremental_frames_match_a_full_redraw(gui, monkeypatch):
+    pushed = []
+    monkeypatch.setattr(pygame.display, 'update', lambda rects: pushed.extend(rects))
+    gui.game.player_score = 9990  # "High Score: 10000" and up is wider than the HUD area
+    gui.draw_board()
+    rng = random.Random(2)
+    for _ in range(30):
+        before = gui.screen.copy()
+        play(gui.game, rng, 1)
+        pushed.clear()
+        gui.draw_changes()
+        after = gui.screen.copy()
+        # Outside the areas pushed to the display, nothing changed
+        for rect in pushed:
+            before.fill((0, 0, 0), rect)
+            after.fill((0, 0, 0), rect)
+        assert pixels(after) == pixels(before)
+
+    time.sleep(TILE_POP_TIME / 1000 + 0.05)  # Let the last tiles finish popping in
+    gui.draw_changes()
+    incremental = pixels(gui.screen)
+    gui.draw_board()
+    assert pixels(gui.screen) == incremental
+
+
+def wait_for_hint(gui):
+    gui.hint_search.join(5)
+    events = pygame.event.get(HINT_EVENT)
+    assert len(events) == 1
+    gui.handle_event(events[0])
+
+
+def test_hints_are_searched_without_blocking_key_presses(gui):
+    press_h = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_h)
+    start = time.perf_counter()
+    gui.handle_event(press_h)
+    assert time.perf_counter() - start < HINT_TIME_BUDGET
+    assert gui.hint is None and gui.hint_search.is_alive()  # Still searching, in its thread
+    wait_for_hint(gui)
+    assert gui.hint in DIRECTIONS
+
+    # A hint for a board that changed while it was searched is dropped
+    gui.handle_event(press_h)
+    play(gui.game, random.Random(3), 5)
+    wait_for_hint(gui)
+    assert gui.hint is None
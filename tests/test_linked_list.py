@@ -0,0 +1,73 @@
+from conftest import DIRECTIONS
+from DataStructure.DoublyLinkedList import DoublyLinkedList
+from DataStructure.MoveCache import MoveCache, zobrist_key
+from Game import Game2048
+import random
+import pytest
+
+
+def rescan(sparse_matrix, rows, cols):
+    """
+    Recompute from scratch what the list keeps up to date as nodes are indexed and unindexed.
+    """
+    tiles = {(i, j): sparse_matrix.get_node(i, j).value
+             for i in range(rows) for j in range(cols) if sparse_matrix.get_node(i, j)}
+    pairs = sum(tiles.get((i + delta_i, j + delta_j)) == value
+                for (i, j), value in tiles.items() for delta_i, delta_j in ((0, 1), (1, 0)))
+    value_counts = {}
+    zobrist = 0
+    for (i, j), value in tiles.items():
+        value_counts[value] = value_counts.get(value, 0) + 1
+        zobrist ^= zobrist_key(value, i, j)
+    empty = [i * cols + j for i in range(rows) for j in range(cols) if (i, j) not in tiles]
+    return pairs, value_counts, max(tiles.values(), default=0), zobrist, len(tiles), empty
+
+
+def kept(sparse_matrix):
+    free_cells = sparse_matrix._free_cells
+    return (sparse_matrix.mergeable_pairs, sparse_matrix._value_counts, sparse_matrix.max_value,
+            sparse_matrix.fingerprint(), sparse_matrix.size, None if free_cells is None else list(free_cells))
+
+
+@pytest.mark.parametrize('rows, cols, cached', [(4, 4, False), (3, 5, False), (2, 2, False), (4, 4, True)])
+def test_kept_counts_match_a_rescan(rows, cols, cached):
+    rng = random.Random(rows * cols)
+    move_cache = MoveCache(256) if cached else None  # Hits apply their delta through apply_diff
+    for _ in range(30):
+        game = Game2048(rows, cols, backend='linked', rng=random.Random(rng.random()), move_cache=move_cache)
+        for step in range(200):
+            game.shift_tiles(rng.choice(DIRECTIONS))
+            if step % 13 == 0:
+                game.undo()  # Rebuilds the list through from_snapshot
+            if step % 29 == 0:
+                game.redo()
+            expected = rescan(game.sparse_matrix, rows, cols)
+            state = kept(game.sparse_matrix)
+            assert state[:5] == expected[:5]
+            assert state[5] is None or state[5] == expected[5]
+            assert game.check_game_over() == (not expected[5] and not expected[0])
+            if game.check_game_over():
+                break
+
+
+def test_kept_counts_match_a_rescan_after_any_list_operation():
+    rng = random.Random(3)
+    sparse_matrix = DoublyLinkedList(4, 5)
+    sparse_matrix.random_empty_cell(rng)  # Build the free list so it is kept up to date too
+    for _ in range(2000):
+        cells = [(i, j) for i in range(4) for j in range(5)]
+        occupied = [cell for cell in cells if sparse_matrix.get_node(*cell)]
+        empty = [cell for cell in cells if not sparse_matrix.get_node(*cell)]
+        operation = rng.randrange(5)
+        if operation == 0 and empty or not occupied:
+            sparse_matrix.add_node(2 ** rng.randint(1, 4), *rng.choice(empty))
+        elif operation == 1:
+            sparse_matrix.delete_node(sparse_matrix.get_node(*rng.choice(occupied)))
+        elif operation == 2:
+            sparse_matrix.update_node(sparse_matrix.get_node(*rng.choice(occupied)), 2 ** rng.randint(1, 4))
+        elif operation == 3 and empty:
+            sparse_matrix.move_node(sparse_matrix.get_node(*rng.choice(occupied)), *rng.choice(empty))
+        elif operation == 4:
+            sparse_matrix = DoublyLinkedList.from_snapshot(sparse_matrix.snapshot(), 4, 5)
+            sparse_matrix.random_empty_cell(rng)
+        assert kept(sparse_matrix) == rescan(sparse_matrix, 4, 5)
@@ -0,0 +1,57 @@
+from conftest import DIRECTIONS, board
+from DataStructure.MoveCache import MoveCache
+from Game import Game2048
+import random
+import pytest
+
+
+def play_games(backend, size, move_cache):
+    """
+    Play two games from the same seed, retrying moves after some undos so boards come back.
+    :return: The games and the number of shift_tiles calls.
+    """
+    games = []
+    shifts = 0
+    for _ in range(2):  # The second game replays the first one: every move was seen
+        game = Game2048(size, size, backend=backend, rng=random.Random(1), move_cache=move_cache)
+        rng = random.Random(2)
+        for step in range(150):
+            direction = rng.choice(DIRECTIONS)
+            game.shift_tiles(direction)
+            shifts += 1
+            if step % 10 == 9:
+                game.undo()
+                game.shift_tiles(direction)  # From a board seen before
+                shifts += 1
+        games.append(game)
+    return games, shifts
+
+
+def history(game):
+    """
+    Return the boards and scores of the game back to the oldest undoable move (the game is undone).
+    """
+    states = [(board(game), game.player_score)]
+    while game.journal.can_undo():
+        game.undo()
+        states.append((board(game), game.player_score))
+    return states
+
+
+@pytest.mark.parametrize('backend, size', [('linked', 4), ('bitboard', 4), ('dense', 4), ('linked', 5), ('dense', 5)])
+def test_cached_moves_play_like_computed_ones(backend, size):
+    plain, shifts = play_games(backend, size, None)
+    expected = [history(game) for game in plain]
+
+    for capacity in (1 << 16, 16):
+        move_cache = MoveCache(capacity)
+        games, _ = play_games(backend, size, move_cache)
+        assert [history(game) for game in games] == expected
+        assert move_cache.hits + move_cache.misses == shifts
+        assert move_cache.evictions == move_cache.misses - len(move_cache)
+        if capacity > shifts:
+            assert move_cache.hits >= shifts // 2  # At least the whole second game
+            assert move_cache.evictions == 0
+        else:
+            assert len(move_cache) == capacity
+            assert move_cache.evictions > 0
@@ -0,0 +1,61 @@
+from conftest import board, play
+from DataStructure.MoveJournal import MoveJournal, entry_size
+from Game import Game2048
+import random
+import pytest
+
+
+def used(journal):
+    return sum(entry_size(entry) for entry in journal.undo_entries) + \
+        sum(entry_size(entry) for entry in journal.redo_entries)
+
+
+@pytest.mark.parametrize('backend, budget', [('linked', 15000), ('bitboard', 2000), ('dense', 5000)])
+def test_small_budget_forgets_the_oldest_moves_first(backend, budget):
+    small = Game2048(4, 4, backend=backend, undo_memory_budget=budget, rng=random.Random(1))
+    large = Game2048(4, 4, backend=backend, rng=random.Random(1))
+    for game in (small, large):
+        play(game, random.Random(2), 80)
+    assert 1 < len(small.journal) < len(large.journal)
+    assert small.journal.memory_used == used(small.journal) <= budget
+
+    # The moves that are left are the last ones: undoing them goes back the same way
+    while small.journal.can_undo():
+        small.undo()
+        large.undo()
+        assert board(small) == board(large)
+        assert small.player_score == large.player_score
+    assert not small.journal.can_undo() and large.journal.can_undo()
+
+
+def test_memory_used_follows_record_undo_redo_and_restore():
+    game = Game2048(4, 4, backend='dense', undo_memory_budget=1500, rng=random.Random(3))
+    journal = game.journal
+    rng = random.Random(4)
+    for step in range(120):
+        play(game, rng, 1)
+        if step % 5 == 0:
+            game.undo()
+            game.undo()
+        if step % 7 == 0:
+            game.redo()  # The next move clears what is left to redo
+        assert journal.memory_used == used(journal) <= journal.memory_budget
+
+    undo_entries, redo_entries = list(journal.undo_entries), list(journal.redo_entries)
+    restored = MoveJournal(journal.memory_budget)
+    restored.restore(undo_entries, redo_entries)
+    assert restored.memory_used == journal.memory_used
+
+
+def test_the_last_move_is_kept_whatever_the_budget():
+    game = Game2048(4, 4, backend='linked', undo_memory_budget=0, rng=random.Random(5))
+    rng = random.Random(6)
+    for _ in range(10):
+        before = (board(game), game.player_score)
+        play(game, rng, 1)
+        if game.has_moved:
+            last = before
+        assert len(game.journal) == 1
+    game.undo()
+    assert (board(game), game.player_score) == last
+    assert not game.journal.can_undo()
@@ -0,0 +1,77 @@
+from conftest import board, play
+from Game import Game2048
+from Record import GameRecordReader, GameRecordWriter
+from Replay import GameReplay
+import os
+import random
+import subprocess
+import sys
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize('backend', ['linked', 'bitboard', 'dense'])
+def test_game_recorded_from_the_middle_replays_to_the_same_end(backend, tmp_path):
+    path = tmp_path / 'games.rec'
+    game = Game2048(4, 4, backend=backend, rng=random.Random(1))
+    rng = random.Random(2)
+    play(game, rng, 40)
+    with GameRecordWriter(path) as writer:
+        writer.record(game)
+        play(game, rng, 5)
+        for _ in range(8):
+            game.undo()  # Past the start of the recording
+        game.redo()
+        play(game, rng, 30)
+        game.undo()
+        game.undo()
+        game.redo()
+
+    with GameRecordReader(path) as reader:
+        record = reader.game(0)
+        replay = GameReplay.from_record(record, checkpoint_interval=8)
+        assert replay.seek(0).player_score == record.score
+        replayed = replay.seek(len(replay))
+        assert board(replayed) == board(game)
+        assert replayed.player_score == game.player_score
+
+
+KILLED_SESSION = """
+import os, random, sys
+from Game import Game2048
+from Record import GameRecordWriter
+writer = GameRecordWriter(sys.argv[1], append=True)
+game = Game2048(4, 4, backend='dense', rng=random.Random(5))
+writer.record(game)
+rng = random.Random(6)
+for step in range(40):
+    game.shift_tiles(rng.choice(('left', 'right', 'up', 'down')))
+    if step % 9 == 8:
+        game.undo()
+print([[game.get_value(i, j) for j in range(4)] for i in range(4)], game.player_score, flush=True)
+os._exit(1)  # Killed mid-game: no finish(), no close()
+"""
+
+
+def test_games_after_a_killed_session_are_read_back(tmp_path):
+    path = tmp_path / 'games.rec'
+    GameRecordWriter(path).close()
+    killed = subprocess.run([sys.executable, '-c', KILLED_SESSION, str(path)], cwd=REPO,
+                            capture_output=True, text=True)
+    assert killed.returncode == 1, killed.stderr
+    with open(path, 'ab') as file:
+        file.write(b'\x07')  # The first byte of a move that was still being written
+
+    game = Game2048(3, 3, backend='linked', rng=random.Random(7))
+    with GameRecordWriter(path, append=True) as writer:
+        writer.record(game)
+        play(game, random.Random(8), 30)
+
+    with GameRecordReader(path) as reader:
+        killed_game, appended_game = list(reader)
+        replayed = GameReplay.from_record(killed_game).seek(len(killed_game))
+        assert f"{board(replayed)} {replayed.player_score}" == killed.stdout.strip()
+        replayed = GameReplay.from_record(appended_game).seek(len(appended_game))
+        assert board(replayed) == board(game)
+        assert replayed.player_score == game.player_score
@@ -0,0 +1,43 @@
+from conftest import board, play
+from Game import Game2048
+from Replay import GameReplay
+import SaveState
+import random
+import pytest
+
+
+@pytest.mark.parametrize('backend, rows, cols', [('linked', 4, 4), ('bitboard', 4, 4), ('dense', 4, 4),
+                                                 ('linked', 9, 9), ('dense', 9, 9)])
+def test_loaded_game_plays_on_like_the_saved_one(backend, rows, cols):
+    game = Game2048(rows, cols, backend=backend, rng=random.Random(1))
+    play(game, random.Random(2), 60)
+    game.undo()
+    game.undo()
+    game.redo()
+    play(game, random.Random(4), 20)  # The free list of empty cells has a history again
+
+    loaded = SaveState.loads(SaveState.dumps(game))
+    assert board(loaded) == board(game)
+    assert loaded.player_score == game.player_score
+
+    # Same spawns, same history
+    for played in (game, loaded):
+        play(played, random.Random(3), 40)
+        played.undo()
+    assert board(loaded) == board(game)
+    assert loaded.player_score == game.player_score
+    while game.journal.can_undo():
+        game.undo()
+        loaded.undo()
+        assert board(loaded) == board(game)
+
+
+
+def test_loading_and_replaying_leave_the_random_module_alone():
+    game = Game2048(4, 4, backend='linked', rng=random.Random(1))
+    play(game, random.Random(2), 30)
+    data = SaveState.dumps(game, include_rng=False)  # Loaded with a fresh random.Random
+    state = random.getstate()
+    SaveState.loads(data)
+    GameReplay.from_seed(4, 4, 1, ['left', 'up', 'right', 'down'] * 5)
+    assert random.getstate() == state
@@ -0,0 +1,19 @@
+from conftest import play
+from Game import Game2048
+from Solver import ExpectimaxSolver, pack_game
+import random
+
+
+def test_parallel_search_finds_the_serial_move():
+    games = []
+    for seed in range(4):
+        game = Game2048(4, 4, backend='bitboard', rng=random.Random(seed))
+        play(game, random.Random(seed + 100), 20 + 15 * seed)
+        games.append(game)
+
+    serial = ExpectimaxSolver(workers=1)
+    with ExpectimaxSolver(workers=2) as parallel:
+        for game in games:
+            board = pack_game(game)
+            assert parallel.evaluate_moves(board, 3) == serial.evaluate_moves(board, 3)
+            assert parallel.best_move(game, depth=3) == serial.best_move(game, depth=3)